@@ -55,53 +55,64 @@ Method summary:
 
 import argparse
 import math
-import random
+import os
+import re
 import sys
 import time
 from dataclasses import dataclass
 # from typing import Dict, List, Set, Tuple
 from typing import Dict, List, Optional, Set, Tuple
 
+import numpy as np
+
+# Shared helpers (flp_common) live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flp_common import coverage_threshold2, njit, run_restart_streams
+
 # ---------------------------------------------------------------------------
 # Data classes
 # ---------------------------------------------------------------------------
 
 @dataclass
-class Client:
-    name: str
-    x: float
-    y: float
+class Instance:
+    """
+    Structure-of-arrays instance: one array per field, row i = client i
+    (or facility i).
+    """
+    client_names: np.ndarray       # (n_clients,) object
+    client_xy: np.ndarray          # (n_clients, 2) float64
+    facility_names: np.ndarray     # (n_facilities,) object
+    facility_xy: np.ndarray        # (n_facilities, 2) float64
+    facility_open_flag: np.ndarray  # (n_facilities,) bool
+    coverage_distance: float
 
+    @property
+    def n_clients(self) -> int:
+        return self.client_xy.shape[0]
 
-@dataclass
-class Facility:
-    name: str
-    x: float
-    y: float
-    initially_open: bool
+    @property
+    def n_facilities(self) -> int:
+        return self.facility_xy.shape[0]
 
 
 @dataclass
-class Instance:
-    clients: List[Client]
-    facilities: List[Facility]
-    coverage_distance: float
+class Distances:
+    dist2: np.ndarray  # (n_clients, n_facilities) squared distances, float32
+    # CSR candidate lists, restricted to pairs within coverage:
+    #   cand_fac[cand_ptr[c]:cand_ptr[c+1]]   facilities of client c, nearest-first
+    #   cover_cli[cover_ptr[f]:cover_ptr[f+1]] clients of facility f, by index
+    cand_ptr: np.ndarray
+    cand_fac: np.ndarray
+    cover_ptr: np.ndarray
+    cover_cli: np.ndarray
 
 
 # ---------------------------------------------------------------------------
 # Input parsing
 # ---------------------------------------------------------------------------
 
-def _next_data_line(stream) -> str:
-    """Return next non-empty NON-comment line."""
-    while True:
-        line = stream.readline()
-        if not line:
-            return ""
-        s = line.strip()
-        if not s or s.startswith("#"):
-            continue
-        return s
+# Whole-line comments ("# ...") are ignored, like blank lines.
+_COMMENT_LINE = re.compile(r"^[ \t]*#.*$", re.MULTILINE)
 
 
 def read_instance(stream) -> Instance:
@@ -114,35 +125,51 @@ def read_instance(stream) -> Instance:
         <facility_name> <x> <y> <open_flag>
         ...
         <coverage_distance>
+
+    The stream is read once and split into lines; each client and facility
+    line must have exactly 3 or 4 fields. The coordinate columns are then
+    converted to float64 arrays in a single NumPy pass each.
     """
-    header = _next_data_line(stream)
-    if not header:
+    data = _COMMENT_LINE.sub("", stream.read())
+    lines = [line for line in data.splitlines() if line.strip()]
+    if not lines:
         raise ValueError("Expected: n_clients n_facilities")
 
-    parts = header.split()
+    parts = lines[0].split()
     if len(parts) != 2:
         raise ValueError("Header must be: n_clients n_facilities")
     nC = int(parts[0])
     nF = int(parts[1])
 
-    clients: List[Client] = []
-    for _ in range(nC):
-        line = _next_data_line(stream)
-        nm, xs, ys = line.split()
-        clients.append(Client(nm, float(xs), float(ys)))
-
-    facilities: List[Facility] = []
-    for _ in range(nF):
-        line = _next_data_line(stream)
-        nm, xs, ys, fl = line.split()
-        facilities.append(Facility(nm, float(xs), float(ys), bool(int(fl))))
-
-    cov_line = _next_data_line(stream)
-    if not cov_line:
+    if len(lines) < 1 + nC + nF:
+        raise ValueError(
+            f"Expected {nC} client and {nF} facility lines after the header."
+        )
+    if len(lines) < 2 + nC + nF:
         raise ValueError("Missing coverage distance line.")
-    coverage = float(cov_line)
 
-    return Instance(clients, facilities, coverage)
+    client_fields = [line.split() for line in lines[1:1 + nC]]
+    for line, fields in zip(lines[1:1 + nC], client_fields):
+        if len(fields) != 3:
+            raise ValueError(f"Client line must be: name x y, got {line!r}")
+    fac_fields = [line.split() for line in lines[1 + nC:1 + nC + nF]]
+    for line, fields in zip(lines[1 + nC:1 + nC + nF], fac_fields):
+        if len(fields) != 4:
+            raise ValueError(
+                f"Facility line must be: name x y open_flag, got {line!r}"
+            )
+
+    client_rows = np.array(client_fields, dtype=str).reshape(nC, 3)
+    fac_rows = np.array(fac_fields, dtype=str).reshape(nF, 4)
+
+    return Instance(
+        client_names=client_rows[:, 0].astype(object),
+        client_xy=client_rows[:, 1:].astype(np.float64).reshape(nC, 2),
+        facility_names=fac_rows[:, 0].astype(object),
+        facility_xy=fac_rows[:, 1:3].astype(np.float64).reshape(nF, 2),
+        facility_open_flag=fac_rows[:, 3].astype(np.int64).astype(bool),
+        coverage_distance=float(lines[1 + nC + nF]),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -153,6 +180,8 @@ def write_solution(
     inst: Instance,
     open_facilities: Set[int],
     assignment: Dict[int, int],
+    dist2: Optional[np.ndarray] = None,
+    total_dist: Optional[float] = None,
     out=sys.stdout,
 ) -> None:
     
@@ -168,23 +197,30 @@ def write_solution(
         F1 covers: C1 C4
         F3 covers: C2
         F7 covers: C3 C5
+
+    Callers that already know the total distance pass it as `total_dist`;
+    otherwise it is summed from the squared-distance matrix `dist2` if
+    given, or from the coordinates, in one vectorized pass.
     """
-    facs = inst.facilities
-    clts = inst.clients
+    fac_names = inst.facility_names
+    client_names = inst.client_names
     
-    # ---- compute total distance of this solution ----
-    total_dist = 0.0
-    for ci, fj in assignment.items():
-        c = clts[ci]
-        f = facs[fj]
-        total_dist += euclidean(c.x, c.y, f.x, f.y)
+    # ---- total distance of this solution ----
+    if total_dist is None:
+        ci = np.fromiter(assignment.keys(), dtype=np.int64, count=len(assignment))
+        fj = np.fromiter(assignment.values(), dtype=np.int64, count=len(assignment))
+        if dist2 is not None:
+            total_dist = float(np.sqrt(dist2[ci, fj], dtype=np.float64).sum())
+        else:
+            diff = inst.client_xy[ci] - inst.facility_xy[fj]
+            total_dist = float(np.hypot(diff[:, 0], diff[:, 1]).sum())
 
     # print total distance first (for humans)
     print(f"Total distance: {total_dist:.4f}", file=out)
     print("", file=out)
 
     print("Open facilities:", file=out)
-    names = [facs[j].name for j in sorted(open_facilities)]
+    names = [fac_names[j] for j in sorted(open_facilities)]
     print(" ".join(names), file=out)
     print("", file=out)
 
@@ -192,10 +228,10 @@ def write_solution(
     cover_map: Dict[int, List[str]] = {j: [] for j in open_facilities}
     for ci, fj in assignment.items():
         if fj in cover_map:
-            cover_map[fj].append(clts[ci].name)
+            cover_map[fj].append(client_names[ci])
 
     for j in sorted(open_facilities):
-        fname = facs[j].name
+        fname = fac_names[j]
         served = cover_map.get(j, [])
         if served:
             print(f"{fname} covers: " + " ".join(served), file=out)
@@ -211,17 +247,64 @@ def euclidean(x1: float, y1: float, x2: float, y2: float) -> float:
     return math.hypot(x1 - x2, y1 - y2)
 
 
-def precompute_distances(inst: Instance) -> List[List[float]]:
+def precompute_distances(inst: Instance) -> Distances:
+    """
+    dist2[c, f] = SQUARED distance from client c to facility f.
+
+    Plus the pairs within the coverage distance, in CSR form both ways:
+    per client the candidate facilities sorted by distance, and per
+    facility the clients it can serve. Pairs beyond coverage can never be
+    assigned, so the search kernels walk only these lists.
+
+    Computed in one NumPy broadcast over the (n_clients, n_facilities) grid.
+    Squared distances give the same nearest-facility order and, compared
+    against coverage_threshold2(coverage), the same coverage test as
+    sqrt(d2) <= coverage (boundary pairs included), so no sqrt is taken here.
+
+    dist2 is stored as float32, halving the memory the kernels stream
+    through; the coverage lists and their nearest-first order are decided
+    at full precision before the cast. Distance sums stay float64.
+    """
+    client_xy = inst.client_xy
+    fac_xy = inst.facility_xy
+
+    dx = client_xy[:, 0][:, None] - fac_xy[:, 0][None, :]
+    dy = client_xy[:, 1][:, None] - fac_xy[:, 1][None, :]
+    dist2 = dx * dx + dy * dy
+
+    within = dist2 <= coverage_threshold2(inst.coverage_distance)
+
+    # Client -> facilities, ordered by (client, distance, facility index) so
+    # equidistant facilities keep lowest-index-first order.
+    rows, cols = np.nonzero(within)
+    by_dist = np.lexsort((cols, dist2[rows, cols], rows))
+    cand_fac = cols[by_dist].astype(np.int32)
+    cand_ptr = np.zeros(within.shape[0] + 1, dtype=np.int64)
+    np.cumsum(within.sum(axis=1), out=cand_ptr[1:])
+
+    # Facility -> clients, clients in index order
+    cover_cli = np.nonzero(within.T)[1].astype(np.int32)
+    cover_ptr = np.zeros(within.shape[1] + 1, dtype=np.int64)
+    np.cumsum(within.sum(axis=0), out=cover_ptr[1:])
+
+    # Row-major, unit-stride rows: numba specializes kernels on array
+    # layout, and the warm-up compiles the C-contiguous ("C") versions.
+    return Distances(
+        dist2=np.ascontiguousarray(dist2, dtype=np.float32),
+        cand_ptr=cand_ptr,
+        cand_fac=cand_fac,
+        cover_ptr=cover_ptr,
+        cover_cli=cover_cli,
+    )
+
+
+def _coverage2(dist2: np.ndarray, coverage: float) -> float:
     """
-    dist[c][f] = distance from client c to facility f.
+    coverage_threshold2(coverage) rounded to dist2's dtype. Rounding is
+    monotone, so every pair within coverage at full precision still passes
+    `d2 <= coverage2` after both sides are rounded to float32.
     """
-    dist: List[List[float]] = []
-    for c in inst.clients:
-        row = []
-        for f in inst.facilities:
-            row.append(euclidean(c.x, c.y, f.x, f.y))
-        dist.append(row)
-    return dist
+    return float(dist2.dtype.type(coverage_threshold2(coverage)))
 
 
 # ---------------------------------------------------------------------------
@@ -235,51 +318,99 @@ def precompute_distances(inst: Instance) -> List[List[float]]:
 # ) -> Tuple[Dict[int, int] | None, bool, float]:
     
 
+@njit(fastmath=True, boundscheck=False)
+def _nearest_open(
+    dist2: np.ndarray,
+    cand_ptr: np.ndarray,
+    cand_fac: np.ndarray,
+    open_mask: np.ndarray,
+    coverage2: float,
+    c: int,
+) -> int:
+    """
+    Nearest open facility to client c within coverage, or -1.
+
+    Walks c's candidate list nearest-first: the first open facility is the
+    answer, and the first one beyond coverage proves there is none.
+    """
+    for p in range(cand_ptr[c], cand_ptr[c + 1]):
+        j = cand_fac[p]
+        if dist2[c, j] > coverage2:
+            return -1
+        if open_mask[j]:
+            return j
+    return -1
+
+
+@njit(fastmath=True, boundscheck=False)
+def _assign_njit(
+    dist2: np.ndarray,
+    cand_ptr: np.ndarray,
+    cand_fac: np.ndarray,
+    open_mask: np.ndarray,
+    coverage2: float,
+    out_assign: np.ndarray,
+) -> Tuple[bool, float]:
+    """
+    Compiled kernel behind assign_clients_with_hard_coverage.
+
+    Works on squared distances; only the chosen pair per client pays a sqrt.
+    Writes out_assign[c] for every client and returns (feasible, total_dist).
+    Stops at the first uncovered client; out_assign is then partially filled.
+    """
+    total_dist = 0.0
+    for c in range(dist2.shape[0]):
+        j = _nearest_open(dist2, cand_ptr, cand_fac, open_mask, coverage2, c)
+        if j < 0:
+            return False, 0.0
+        out_assign[c] = j
+        total_dist += math.sqrt(dist2[c, j])
+    return True, total_dist
+
+
 def assign_clients_with_hard_coverage(
     open_set: Set[int],
-    dist: List[List[float]],
+    dists: Distances,
     coverage: float,
-) -> Tuple[Optional[Dict[int, int]], bool, float]:
+    out: Optional[np.ndarray] = None,
+) -> Tuple[Optional[np.ndarray], bool, float]:
     """
     Assign each client to the nearest open facility WITHIN coverage.
+    `dists` is the precomputed table from precompute_distances; its
+    candidate lists already stop at the instance's coverage distance.
 
     Returns:
       (assignment, feasible, total_dist)
 
     - If any client has no open facility within coverage distance, feasible=False
       and assignment is None.
-    - Otherwise feasible=True, assignment maps each client -> facility, and
-      total_dist is the sum of distances for all assignments.
+    - Otherwise feasible=True, assignment is an int32 array with
+      assignment[c] = facility index, and total_dist is the sum of distances
+      for all assignments.
+
+    If `out` is given it is used as the assignment buffer (and returned),
+    so hot loops can reuse one allocation.
     """
     if not open_set:
         return None, False, float("inf")
 
-    C = len(dist)
-    assignment: Dict[int, int] = {}
-    total_dist = 0.0
-
-    open_list = sorted(open_set)
-
-    for c in range(C):
-        best_f = None
-        best_d = float("inf")
-
-        for f in open_list:
-            d = dist[c][f]
-            if d <= coverage and d < best_d:
-                best_d = d
-                best_f = f
-
-        if best_f is None:
-            # No facility within coverage for this client: infeasible solution
-            return None, False, float("inf")
+    open_mask = np.zeros(dists.dist2.shape[1], dtype=np.uint8)
+    open_mask[list(open_set)] = 1
+    if out is None:
+        out = np.empty(dists.dist2.shape[0], dtype=np.int32)
 
-        assignment[c] = best_f
-        total_dist += best_d
+    feasible, total_dist = _assign_njit(
+        dists.dist2, dists.cand_ptr, dists.cand_fac, open_mask,
+        _coverage2(dists.dist2, coverage), out
+    )
+    if not feasible:
+        # Some client has no facility within coverage: infeasible solution
+        return None, False, float("inf")
 
-    return assignment, True, total_dist
+    return out, True, float(total_dist)
 
 
+@njit
 def objective(num_open: int, total_dist: float) -> float:
     """
     Scalar objective for feasible solutions:
@@ -303,166 +434,562 @@ def initial_solution(inst: Instance) -> Set[int]:
     client has at least one facility within coverage_distance. If even that
     fails, the instance is infeasible for this coverage radius.
     """
-    return set(range(len(inst.facilities)))
+    return set(range(inst.n_facilities))
 
 
 # ---------------------------------------------------------------------------
-# Local search + simulated annealing (on FEASIBLE solutions only)
+# Open-set bookkeeping
 # ---------------------------------------------------------------------------
+#
+# The open set is a uint8 mask plus a permutation `perm` of all facility
+# indices whose first `open_count` entries are the open facilities and the
+# rest the closed ones; pos[j] is the slot of facility j in perm. Opening or
+# closing a facility is one bit flip and one swap, and a move can draw a
+# random open (perm[:open_count]) or closed (perm[open_count:]) facility
+# in O(1).
+
+@njit
+def _open_facility(
+    j: int,
+    open_mask: np.ndarray,
+    perm: np.ndarray,
+    pos: np.ndarray,
+    open_count: int,
+) -> int:
+    """Mark closed facility j open; return the new open_count."""
+    p = pos[j]
+    other = perm[open_count]
+    perm[p] = other
+    pos[other] = p
+    perm[open_count] = j
+    pos[j] = open_count
+    open_mask[j] = 1
+    return open_count + 1
+
+
+@njit
+def _close_facility(
+    j: int,
+    open_mask: np.ndarray,
+    perm: np.ndarray,
+    pos: np.ndarray,
+    open_count: int,
+) -> int:
+    """Mark open facility j closed; return the new open_count."""
+    last = open_count - 1
+    p = pos[j]
+    other = perm[last]
+    perm[p] = other
+    pos[other] = p
+    perm[last] = j
+    pos[j] = last
+    open_mask[j] = 0
+    return last
+
+
+@njit
+def _undo_move(
+    j_opened: int,
+    j_closed: int,
+    open_mask: np.ndarray,
+    perm: np.ndarray,
+    pos: np.ndarray,
+    open_count: int,
+) -> int:
+    """Revert an OPEN/CLOSE/SWAP move (-1 marks an unused slot)."""
+    if j_opened >= 0:
+        open_count = _close_facility(j_opened, open_mask, perm, pos, open_count)
+    if j_closed >= 0:
+        open_count = _open_facility(j_closed, open_mask, perm, pos, open_count)
+    return open_count
 
-def local_search(
-    inst: Instance,
-    dist: List[List[float]],
-    time_deadline: float,
-    rng: random.Random,
-) -> Tuple[Set[int], Dict[int, int]]:
-    coverage = inst.coverage_distance
-    F = len(inst.facilities)
 
-    # Start from all facilities open
-    current_open = initial_solution(inst)
-    curr_assign, feasible, curr_dist = assign_clients_with_hard_coverage(
-        current_open, dist, coverage
-    )
-    if not feasible:
-        # If even all facilities can't cover all clients, there is no feasible solution.
-        # In that case, just bail out with all facilities open and no assignments.
-        # (Your instance set should not do this.)
-        raise ValueError("Instance appears infeasible: even all facilities open cannot cover all clients.")
+# ---------------------------------------------------------------------------
+# Incremental (delta) reassignment
+# ---------------------------------------------------------------------------
+#
+# Rather than re-scanning every client against every open facility after a
+# move, local_search keeps the current assignment (assign[c], assign_d2[c])
+# and only touches the clients a move can affect:
+#   - OPEN j:  clients covered by j with dist2[c, j] < assign_d2[c] switch to j;
+#   - CLOSE j: clients assigned to j are re-assigned among the open set.
+# Both only look at j's coverage list: a client can only be assigned to, or
+# move to, a facility that covers it.
+# Every overwritten (c, f, d2) triple is pushed onto an undo log so a
+# rejected move is rolled back without copying the whole assignment.
+
+@njit(fastmath=True, boundscheck=False)
+def _delta_open(
+    dist2: np.ndarray,
+    cover_ptr: np.ndarray,
+    cover_cli: np.ndarray,
+    j: int,
+    assign: np.ndarray,
+    assign_d2: np.ndarray,
+    undo_c: np.ndarray,
+    undo_f: np.ndarray,
+    undo_d2: np.ndarray,
+    n_undo: int,
+) -> Tuple[int, float]:
+    """Apply opening facility j; return (n_undo, change in total_dist)."""
+    delta_dist = 0.0
+    for p in range(cover_ptr[j], cover_ptr[j + 1]):
+        c = cover_cli[p]
+        d2 = dist2[c, j]
+        if d2 < assign_d2[c]:
+            undo_c[n_undo] = c
+            undo_f[n_undo] = assign[c]
+            undo_d2[n_undo] = assign_d2[c]
+            n_undo += 1
+            delta_dist += math.sqrt(d2) - math.sqrt(assign_d2[c])
+            assign[c] = j
+            assign_d2[c] = d2
+    return n_undo, delta_dist
+
+
+@njit(fastmath=True, boundscheck=False)
+def _delta_close(
+    dist2: np.ndarray,
+    cand_ptr: np.ndarray,
+    cand_fac: np.ndarray,
+    cover_ptr: np.ndarray,
+    cover_cli: np.ndarray,
+    j: int,
+    open_mask: np.ndarray,
+    coverage2: float,
+    assign: np.ndarray,
+    assign_d2: np.ndarray,
+    undo_c: np.ndarray,
+    undo_f: np.ndarray,
+    undo_d2: np.ndarray,
+    n_undo: int,
+) -> Tuple[bool, int, float]:
+    """
+    Apply closing facility j (already cleared in open_mask).
 
-    curr_cost = objective(len(current_open), curr_dist)
+    Returns (feasible, n_undo, change in total_dist). On infeasibility the
+    assignment is left partially updated; the caller rolls it back.
+    """
+    delta_dist = 0.0
+    for p in range(cover_ptr[j], cover_ptr[j + 1]):
+        c = cover_cli[p]
+        if assign[c] != j:
+            continue
+        best_f = _nearest_open(dist2, cand_ptr, cand_fac, open_mask, coverage2, c)
+        if best_f < 0:
+            return False, n_undo, 0.0
+        best_d2 = dist2[c, best_f]
+        undo_c[n_undo] = c
+        undo_f[n_undo] = j
+        undo_d2[n_undo] = assign_d2[c]
+        n_undo += 1
+        delta_dist += math.sqrt(best_d2) - math.sqrt(assign_d2[c])
+        assign[c] = best_f
+        assign_d2[c] = best_d2
+    return True, n_undo, delta_dist
+
+
+@njit
+def _rollback(
+    assign: np.ndarray,
+    assign_d2: np.ndarray,
+    undo_c: np.ndarray,
+    undo_f: np.ndarray,
+    undo_d2: np.ndarray,
+    n_undo: int,
+) -> None:
+    """Restore the assignment from the undo log, newest entry first."""
+    for k in range(n_undo - 1, -1, -1):
+        c = undo_c[k]
+        assign[c] = undo_f[k]
+        assign_d2[c] = undo_d2[k]
 
-    best_open = set(current_open)
-    best_assign = dict(curr_assign)
-    best_cost = curr_cost
 
-    # Annealing parameters
-    T = 1.0
-    MIN_T = 1e-4
-    COOLING = 0.995
+# ---------------------------------------------------------------------------
+# Local search + simulated annealing (on FEASIBLE solutions only)
+# ---------------------------------------------------------------------------
 
-    # Optional iteration cap to keep complexity clean
-    max_iters = 10 * F * F if F > 0 else 0
-    iters = 0
+@njit(fastmath=True, boundscheck=False)
+def _anneal_njit(
+    dist2: np.ndarray,
+    cand_ptr: np.ndarray,
+    cand_fac: np.ndarray,
+    cover_ptr: np.ndarray,
+    cover_cli: np.ndarray,
+    coverage2: float,
+    open_mask: np.ndarray,
+    perm: np.ndarray,
+    pos: np.ndarray,
+    assign: np.ndarray,
+    assign_d2: np.ndarray,
+    undo_c: np.ndarray,
+    undo_f: np.ndarray,
+    undo_d2: np.ndarray,
+    best_mask: np.ndarray,
+    best_assign: np.ndarray,
+    T_inv: np.ndarray,
+    moves: np.ndarray,
+    picks: np.ndarray,
+    urand: np.ndarray,
+    max_iters: int,
+    open_count: int,
+    k: int,
+    iters: int,
+    curr_dist: float,
+    curr_cost: float,
+    best_cost: float,
+) -> Tuple[int, int, int, float, float, float]:
+    """
+    Run up to len(moves) simulated-annealing iterations entirely in
+    compiled code, one slot of (moves, picks, urand) per iteration.
+
+    All search state lives in the arrays (updated in place) and in the
+    scalars, which are returned as
+    (open_count, k, iters, curr_dist, curr_cost, best_cost)
+    so the caller can resume with the next block of random draws.
+    """
+    F = open_mask.shape[0]
+    n_temps = T_inv.shape[0]
 
-    while time.time() < time_deadline and T > MIN_T and iters < max_iters:
+    for b in range(moves.shape[0]):
+        if k >= n_temps or iters >= max_iters:
+            break
         iters += 1
 
-        move_type = rng.choice(["open", "close", "swap"])
-        neighbor_open = set(current_open)
+        move_type = moves[b]
+        n_closed = F - open_count
 
-        if move_type == "open":
-            closed = [j for j in range(F) if j not in neighbor_open]
-            if not closed:
+        # Apply the move in place; (j_opened, j_closed) lets us undo it.
+        j_opened = -1
+        j_closed = -1
+        if move_type == 0:  # open
+            if n_closed == 0:
                 continue
-            j = rng.choice(closed)
-            neighbor_open.add(j)
+            j_opened = perm[open_count + int(picks[b, 1] * n_closed)]
 
-        elif move_type == "close":
-            if len(neighbor_open) <= 1:
+        elif move_type == 1:  # close
+            if open_count <= 1:
                 continue
-            j = rng.choice(list(neighbor_open))
-            neighbor_open.remove(j)
+            j_closed = perm[int(picks[b, 0] * open_count)]
 
-        else:  # "swap"
-            if len(neighbor_open) == 0:
-                continue
-            closed = [j for j in range(F) if j not in neighbor_open]
-            if not closed:
+        else:  # swap
+            if open_count == 0 or n_closed == 0:
                 continue
-            j_close = rng.choice(list(neighbor_open))
-            j_open = rng.choice(closed)
-            neighbor_open.remove(j_close)
-            neighbor_open.add(j_open)
-
-        # Check feasibility of the neighbor (hard coverage constraint)
-        n_assign, feasible, n_dist = assign_clients_with_hard_coverage(
-            neighbor_open, dist, coverage
-        )
+            j_closed = perm[int(picks[b, 0] * open_count)]
+            j_opened = perm[open_count + int(picks[b, 1] * n_closed)]
+
+        if j_closed >= 0:
+            open_count = _close_facility(j_closed, open_mask, perm, pos, open_count)
+        if j_opened >= 0:
+            open_count = _open_facility(j_opened, open_mask, perm, pos, open_count)
+
+        # Update only the clients the move can affect. For a SWAP the new
+        # facility is applied first, so clients of the closed one can use it.
+        n_undo = 0
+        n_dist = curr_dist
+        feasible = True
+        if j_opened >= 0:
+            n_undo, d_dist = _delta_open(
+                dist2, cover_ptr, cover_cli, j_opened, assign, assign_d2,
+                undo_c, undo_f, undo_d2, n_undo,
+            )
+            n_dist += d_dist
+        if j_closed >= 0:
+            feasible, n_undo, d_dist = _delta_close(
+                dist2, cand_ptr, cand_fac, cover_ptr, cover_cli,
+                j_closed, open_mask, coverage2, assign, assign_d2,
+                undo_c, undo_f, undo_d2, n_undo,
+            )
+            n_dist += d_dist
+
         if not feasible:
-            # Discard infeasible neighbor
+            # Discard infeasible neighbor: restore assignment, flip the bits back
+            _rollback(assign, assign_d2, undo_c, undo_f, undo_d2, n_undo)
+            open_count = _undo_move(
+                j_opened, j_closed, open_mask, perm, pos, open_count
+            )
             continue
 
-        n_cost = objective(len(neighbor_open), n_dist)
+        n_cost = objective(open_count, n_dist)
         delta = n_cost - curr_cost
 
         # Simulated annealing acceptance (only among feasible moves)
         if delta <= 0:
             accept = True
         else:
-            accept_prob = math.exp(-delta / max(T, 1e-9))
-            accept = rng.random() < accept_prob
+            accept = urand[b] < math.exp(-delta * T_inv[k])
 
         if accept:
-            current_open = neighbor_open
-            curr_assign = n_assign
             curr_dist = n_dist
             curr_cost = n_cost
 
             if n_cost < best_cost:
                 best_cost = n_cost
-                best_open = set(neighbor_open)
-                best_assign = dict(n_assign)
+                best_mask[:] = open_mask
+                best_assign[:] = assign
+        else:
+            _rollback(assign, assign_d2, undo_c, undo_f, undo_d2, n_undo)
+            open_count = _undo_move(
+                j_opened, j_closed, open_mask, perm, pos, open_count
+            )
 
-        T *= COOLING
+        k += 1
 
-    return best_open, best_assign
+    return open_count, k, iters, curr_dist, curr_cost, best_cost
+
+
+def _warm_up_kernels() -> None:
+    """
+    Trigger JIT compilation on a tiny input so it is not charged against
+    the anytime time limit.
+
+    The kernels are not cached on disk: numba's cache records the module
+    name they were compiled under, and this file is imported both as
+    facility_location_approx_blake and through its package path.
+    """
+    dist2 = np.zeros((1, 1), dtype=np.float32)
+    ptr = np.array([0, 1], dtype=np.int64)
+    idx = np.zeros(1, dtype=np.int32)
+    mask = np.ones(1, dtype=np.uint8)
+    perm = np.zeros(1, dtype=np.int32)
+    pos = np.zeros(1, dtype=np.int32)
+    assign = np.zeros(1, dtype=np.int32)
+    assign_d2 = np.zeros(1, dtype=np.float32)
+    _assign_njit(dist2, ptr, idx, mask, 0.0, assign)
+    _anneal_njit(
+        dist2, ptr, idx, ptr, idx, 0.0,
+        mask, perm, pos, assign, assign_d2,
+        np.empty(2, dtype=np.int32), np.empty(2, dtype=np.int32),
+        np.empty(2, dtype=np.float32), mask.copy(), assign.copy(),
+        np.ones(1, dtype=np.float64), np.zeros(1, dtype=np.int64),
+        np.zeros((1, 2), dtype=np.float64), np.zeros(1, dtype=np.float64), 1,
+        1, 0, 0, 0.0, 0.0, 0.0,
+    )
+    objective(1, 0.0)
+
+
+def local_search(
+    inst: Instance,
+    dists: Distances,
+    time_deadline: float,
+    rng: np.random.Generator,
+    schedule: Tuple[float, float] = (1.0, 0.995),
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    One simulated-annealing run from the all-open solution, cooling from
+    T0 by a factor COOLING per evaluated feasible move (accepted or not),
+    with schedule = (T0, COOLING).
+
+    Returns (best_mask, best_assign, best_cost): the uint8 open mask and
+    int32 client -> facility assignment of the best feasible solution seen,
+    and its objective value.
+    """
+    dist2 = dists.dist2
+    cand_ptr, cand_fac = dists.cand_ptr, dists.cand_fac
+    cover_ptr, cover_cli = dists.cover_ptr, dists.cover_cli
+    coverage2 = _coverage2(dist2, inst.coverage_distance)
+    F = inst.n_facilities
+    C = inst.n_clients
+
+    # Start from all facilities open
+    open_mask = np.zeros(F, dtype=np.uint8)
+    open_mask[sorted(initial_solution(inst))] = 1
+    perm = np.argsort(open_mask == 0, kind="stable").astype(np.int32)
+    pos = np.empty(F, dtype=np.int32)
+    pos[perm] = np.arange(F, dtype=np.int32)
+    open_count = int(open_mask.sum())
+
+    # Current assignment, maintained incrementally across moves
+    assign = np.empty(C, dtype=np.int32)
+    feasible, curr_dist = _assign_njit(
+        dist2, cand_ptr, cand_fac, open_mask, coverage2, assign
+    )
+    if open_count == 0 or not feasible:
+        # If even all facilities can't cover all clients, there is no feasible solution.
+        # In that case, just bail out with all facilities open and no assignments.
+        # (Your instance set should not do this.)
+        raise ValueError("Instance appears infeasible: even all facilities open cannot cover all clients.")
+    assign_d2 = dist2[np.arange(C), assign]
+
+    # Undo log: a SWAP can touch each client at most twice
+    undo_c = np.empty(2 * C, dtype=np.int32)
+    undo_f = np.empty(2 * C, dtype=np.int32)
+    undo_d2 = np.empty(2 * C, dtype=dist2.dtype)
+
+    curr_cost = objective(open_count, curr_dist)
+
+    best_mask = open_mask.copy()
+    best_assign = assign.copy()
+    best_cost = curr_cost
+
+    # Annealing parameters
+    T0, COOLING = schedule
+    MIN_T = 1e-4
+
+    # The schedule T_k = T0 * COOLING**k is fixed, so tabulate 1/T_k once
+    # (for every T_k > MIN_T) instead of dividing on each acceptance test.
+    n_temps = int(math.ceil(math.log(MIN_T / T0) / math.log(COOLING)))
+    T_inv = 1.0 / (T0 * COOLING ** np.arange(n_temps))
+    k = 0
+
+    # Optional iteration cap to keep complexity clean
+    max_iters = 10 * F * F if F > 0 else 0
+    iters = 0
+
+    # The annealing loop runs inside _anneal_njit in blocks of BATCH
+    # iterations; the deadline is checked between blocks. Each block gets
+    # fresh random draws: move type, two facility picks, one acceptance draw.
+    BATCH = 1024
+
+    while time.monotonic() < time_deadline and k < n_temps and iters < max_iters:
+        moves = rng.integers(0, 3, size=BATCH)  # 0=open, 1=close, 2=swap
+        picks = rng.random((BATCH, 2))
+        urand = rng.random(BATCH)
+
+        open_count, k, iters, curr_dist, curr_cost, best_cost = _anneal_njit(
+            dist2, cand_ptr, cand_fac, cover_ptr, cover_cli, coverage2,
+            open_mask, perm, pos, assign, assign_d2,
+            undo_c, undo_f, undo_d2, best_mask, best_assign,
+            T_inv, moves, picks, urand, max_iters,
+            open_count, k, iters, curr_dist, curr_cost, best_cost,
+        )
+
+    # Re-derive the cost from the stored assignment so the value handed to
+    # anytime() carries no rounding accumulated by the incremental deltas.
+    best_dist = float(
+        np.sqrt(dist2[np.arange(C), best_assign], dtype=np.float64).sum()
+    )
+    best_cost = objective(int(best_mask.sum()), best_dist)
+    return best_mask, best_assign, best_cost
 
 
 # ---------------------------------------------------------------------------
 # Anytime wrapper
 # ---------------------------------------------------------------------------
 
-def anytime(
-    inst: Instance,
-    time_limit: float,
-    seed: int | None = None,
-) -> Tuple[Set[int], Dict[int, int]]:
-    rng = random.Random(seed)
-    start = time.time()
-    deadline = start + time_limit
+# (T0, COOLING) portfolio for parallel workers. No single schedule is best
+# on every instance, so worker i anneals with SCHEDULES[i % len(SCHEDULES)];
+# a lone worker uses the first entry.
+SCHEDULES: List[Tuple[float, float]] = [
+    (1.0, 0.995),
+    (2.0, 0.999),
+    (0.3, 0.99),
+    (1.0, 0.998),
+]
 
-    dist = precompute_distances(inst)
 
-    # First local-search run
-    first_deadline = start + time_limit * 400
-    if first_deadline > deadline:
-        first_deadline = deadline
-
-    best_open, best_assign = local_search(inst, dist, first_deadline, rng)
-    _, _, best_dist = assign_clients_with_hard_coverage(
-        best_open, dist, inst.coverage_distance
+def _search_until(
+    inst: Instance,
+    dists: Distances,
+    first_deadline: float,
+    deadline: float,
+    rng: np.random.Generator,
+    schedule: Tuple[float, float] = SCHEDULES[0],
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Run local_search restarts with one cooling schedule until the deadline
+    and return the best (mask, assignment, cost) found.
+    """
+    best_mask, best_assign, best_cost = local_search(
+        inst, dists, first_deadline, rng, schedule
     )
-    best_cost = objective(len(best_open), best_dist)
 
     # Additional restarts while time remains
-    while time.time() < deadline:
-        remaining = deadline - time.time()
+    while time.monotonic() < deadline:
+        remaining = deadline - time.monotonic()
         if remaining <= 0:
             break
 
-        run_deadline = time.time() + remaining * 0.25
+        run_deadline = time.monotonic() + remaining * 0.25
         if run_deadline > deadline:
             run_deadline = deadline
 
         try:
-            cand_open, cand_assign = local_search(inst, dist, run_deadline, rng)
+            cand_mask, cand_assign, cand_cost = local_search(
+                inst, dists, run_deadline, rng, schedule
+            )
         except ValueError:
             # Instance infeasible; stop trying.
             break
 
-        _, feasible, cand_dist = assign_clients_with_hard_coverage(
-            cand_open, dist, inst.coverage_distance
-        )
-        if not feasible:
-            continue
-
-        cand_cost = objective(len(cand_open), cand_dist)
         if cand_cost < best_cost:
             best_cost = cand_cost
-            best_open = cand_open
+            best_mask = cand_mask
             best_assign = cand_assign
 
+    return best_mask, best_assign, best_cost
+
+
+# Per-process (instance, distances), set once by _init_worker in every
+# process that runs a restart stream, so tasks do not re-send the distance
+# matrix. Under fork it is inherited.
+_worker_problem: Optional[Tuple[Instance, Distances]] = None
+
+
+def _init_worker(inst: Instance, dists: Distances) -> None:
+    global _worker_problem
+    _worker_problem = (inst, dists)
+    _warm_up_kernels()
+
+
+def _worker_search(
+    first_deadline: float,
+    deadline: float,
+    schedule: Tuple[float, float],
+    seed_seq: np.random.SeedSequence,
+) -> Tuple[np.ndarray, np.ndarray, float]:
+    inst, dists = _worker_problem
+    rng = np.random.default_rng(seed_seq)
+    return _search_until(inst, dists, first_deadline, deadline, rng, schedule)
+
+
+def anytime(
+    inst: Instance,
+    time_limit: float,
+    seed: int | None = None,
+    workers: int = 1,
+    *,
+    dists: Optional[Distances] = None,
+) -> Tuple[Set[int], np.ndarray]:
+    """
+    Anytime wrapper: independent restart streams, one per worker process
+    (default: a single stream in this process), each restarting
+    local_search until the deadline. The best solution over all workers is returned.
+
+    Every worker gets its own random stream spawned from `seed` and its own
+    cooling schedule from SCHEDULES.
+
+    Callers solving one instance repeatedly can pass the table from
+    precompute_distances as `dists` to skip recomputing it.
+    """
+    _warm_up_kernels()
+
+    workers = max(1, workers)
+
+    start = time.monotonic()
+    deadline = start + time_limit
+
+    if dists is None:
+        dists = precompute_distances(inst)
+
+    # First local-search run
+    first_deadline = start + time_limit * 400
+    if first_deadline > deadline:
+        first_deadline = deadline
+
+    results = run_restart_streams(
+        _worker_search,
+        [
+            (first_deadline, deadline, SCHEDULES[i % len(SCHEDULES)])
+            for i in range(workers)
+        ],
+        seed,
+        _init_worker,
+        (inst, dists),
+    )
+    best_mask, best_assign, _ = min(results, key=lambda r: r[2])
+
+    best_open = set(np.flatnonzero(best_mask).tolist())
     return best_open, best_assign
 
 
@@ -493,6 +1020,12 @@ def main() -> None:
         default=None,
         help="Optional explicit random seed (for reproducible experiments).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parallel restart processes (default: 1).",
+    )
     args = parser.parse_args()
 
     # Read instance
@@ -503,10 +1036,13 @@ def main() -> None:
             inst = read_instance(f)
 
     # Run anytime approximation
-    open_facilities, assignment = anytime(inst, args.t, seed=args.seed)
+    open_facilities, assignment = anytime(
+        inst, args.t, seed=args.seed, workers=args.workers
+    )
 
-    # Print solution
-    write_solution(inst, open_facilities, assignment, out=sys.stdout)
+    # Print solution (write_solution takes a client -> facility dict)
+    assignment_map = dict(enumerate(assignment.tolist()))
+    write_solution(inst, open_facilities, assignment_map, out=sys.stdout)
 
 
 if __name__ == "__main__":
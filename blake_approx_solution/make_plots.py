@@ -1,8 +1,18 @@
-import math
 import os
-import subprocess
+import re
+from multiprocessing import Pool
 
+import matplotlib
+
+matplotlib.use("Agg")  # files only; no GUI toolkit needed
 import matplotlib.pyplot as plt
+import numpy as np
+
+from facility_location_approx_blake import (
+    anytime,
+    precompute_distances,
+    read_instance,
+)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TESTCASE_DIR = os.path.join(BASE_DIR, "..", "testcases")
@@ -18,42 +28,43 @@ EXACT_OUT_DIR = os.path.join(
 )
 
 
-SOLVER = os.path.join(BASE_DIR, "facility_location_approx_blake.py")
-
-
 # -------------------------------------------------------------
 # Input Parsing
 # -------------------------------------------------------------
 def parse_input(path):
     with open(path) as f:
-        data = f.read().strip().split()
-
-    it = iter(data)
-    nC = int(next(it))
-    nF = int(next(it))
-
-    clients = {}
-    for _ in range(nC):
-        name = next(it)
-        x = float(next(it))
-        y = float(next(it))
-        clients[name] = (x, y)
-
-    facs = {}
-    for _ in range(nF):
-        name = next(it)
-        x = float(next(it))
-        y = float(next(it))
-        _flag = next(it)
-        facs[name] = (x, y)
-
-    cov = float(next(it))
+        data = f.read().split()
+
+    nC = int(data[0])
+    nF = int(data[1])
+
+    # Client rows are (name, x, y), facility rows (name, x, y, flag); the
+    # coordinate columns are converted to float in one NumPy pass each.
+    end_c = 2 + 3 * nC
+    end_f = end_c + 4 * nF
+    c_rows = np.array(data[2:end_c], dtype=object).reshape(nC, 3)
+    f_rows = np.array(data[end_c:end_f], dtype=object).reshape(nF, 4)
+    c_xy = c_rows[:, 1:3].astype(float)
+    f_xy = f_rows[:, 1:3].astype(float)
+
+    # clients / facs are (name -> row index, (n, 2) coordinates) pairs
+    clients = ({name: i for i, name in enumerate(c_rows[:, 0].tolist())}, c_xy)
+    facs = ({name: j for j, name in enumerate(f_rows[:, 0].tolist())}, f_xy)
+
+    cov = float(data[end_f])
     return clients, facs, cov
 
 
 # -------------------------------------------------------------
 # Output Parsing
 # -------------------------------------------------------------
+# Compiled once; parse_output runs them over a whole file at a time.
+_OPEN_RE = re.compile(r"^[ \t]*Open facilities[^\n]*\n\s*^[ \t]*(?!Coverage)(\S[^\n]*)", re.M)
+_COVERAGE_HEADER_RE = re.compile(r"^[ \t]*Coverage[^\n]*$", re.M)
+_CHOSEN_RE = re.compile(r"^[ \t]*(?!Facilities chosen)(\S+)[^\n]*$", re.M)
+_COVERS_RE = re.compile(r"^[ \t]*(.*?)[ \t]*covers:(.*)$", re.M)
+
+
 def parse_output(path):
     """
     Parse either:
@@ -84,71 +95,38 @@ def parse_output(path):
         return None, None
 
     with open(path) as f:
-        lines = [line.rstrip("\n") for line in f]
+        text = f.read()
 
     # --------- Case A: approx format ("Open facilities") ----------
-    if any("Open facilities" in line for line in lines):
-        mode = None
-        open_facs: list[str] = []
-        coverage: dict[str, list[str]] = {}
-
-        for line in lines:
-            s = line.strip()
-            if not s:
-                continue
-            if s.startswith("Open facilities"):
-                mode = "open"
-                continue
-            if s.startswith("Coverage"):
-                mode = "cov"
-                continue
-            if mode == "open":
-                # line with facility names: "F1 F3 F7"
-                open_facs = s.split()
-            if mode == "cov" and "covers:" in s:
-                fac, rest = s.split("covers:")
-                fac = fac.strip()
-                coverage[fac] = rest.strip().split()
-
+    if "Open facilities" in text:
+        m = _OPEN_RE.search(text)
+        open_facs = m.group(1).split() if m else []
         if not open_facs:
             return None, None
+
+        section = _COVERAGE_HEADER_RE.search(text, m.end())
+        coverage = {}
+        if section:
+            for fac, rest in _COVERS_RE.findall(text, section.end()):
+                coverage[fac] = rest.split()
         return open_facs, coverage
 
     # --------- Case B: exact solver format ("Facilities chosen" / "Coverage mapping") ----------
-    mode = None
-    open_facs: list[str] = []
-    coverage: dict[str, list[str]] = {}
-
-    for line in lines:
-        s = line.strip()
-        if not s:
-            continue
-
-        if s.startswith("Facilities chosen"):
-            mode = "chosen"
-            continue
-        if s.startswith("Unique Client Assignment"):
-            mode = "covmap"
-            continue
-
-        if mode == "chosen":
-            # Example: "F2 at (54.5, 90.05)"
-            parts = s.split()
-            if parts:
-                fac_name = parts[0]   # "F2"
-                open_facs.append(fac_name)
-
-        elif mode == "covmap" and "covers:" in s:
-            # Example: "F2 covers: C1, C6, C7"
-            fac, rest = s.split("covers:")
-            fac = fac.strip()
-            # split, strip commas
-            tokens = [tok.strip().strip(",") for tok in rest.strip().split()]
-            clients = [t for t in tokens if t]   # remove empties
-            coverage[fac] = clients
+    chosen = text.find("Facilities chosen")
+    covmap = text.find("Unique Client Assignment")
+    if chosen < 0:
+        return None, None
 
+    open_facs = _CHOSEN_RE.findall(text, chosen, covmap if covmap > chosen else len(text))
     if not open_facs:
         return None, None
+
+    coverage = {}
+    if covmap >= 0:
+        for fac, rest in _COVERS_RE.findall(text, covmap):
+            # split, strip commas, drop empties
+            tokens = [tok.strip(",") for tok in rest.split()]
+            coverage[fac] = [t for t in tokens if t]
     return open_facs, coverage
 
 
@@ -156,62 +134,43 @@ def parse_output(path):
 # Distance Computation
 # -------------------------------------------------------------
 def compute_total_distance(clients, facs, coverage):
-    total = 0.0
+    # Translate every assignment to (facility row, client row) once, then
+    # index the coordinate arrays and take one vectorized hypot.
+    client_index, client_xy = clients
+    fac_index, fac_xy = facs
+
+    fac_rows = []
+    client_rows = []
     for fac, client_list in coverage.items():
-        if fac not in facs:
+        if fac not in fac_index:
             print(f"WARNING: approx output lists facility {fac} not in input. Skipping.")
             continue
-        
-        fx, fy = facs[fac]
-        for c in client_list:
-            cx, cy = clients[c]
-            total += math.dist((fx, fy), (cx, cy))
-    return total
+
+        fac_rows.extend([fac_index[fac]] * len(client_list))
+        client_rows.extend(map(client_index.__getitem__, client_list))
+
+    if not client_rows:
+        return 0.0
+    d = client_xy[client_rows] - fac_xy[fac_rows]
+    return float(np.hypot(d[:, 0], d[:, 1]).sum())
 
 
 # -------------------------------------------------------------
 # ANYTIME IMPROVEMENT
 # -------------------------------------------------------------
 def run_anytime(case_file, time_values, seed = 143):
-    costs = []
+    # Solve in-process: the instance is parsed and its distance table built
+    # once, then reused for every time limit.
+    with open(case_file) as f:
+        inst = read_instance(f)
+    dists = precompute_distances(inst)
 
+    costs = []
     for t in time_values:
-        cmd = [
-            "python3",
-            SOLVER,
-            "-t", str(t),
-            "--seed", str(seed),
-            case_file
-        ]
-
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        out, err = proc.communicate()
-        out = out.decode()
-
-        mode = None
-        open_facs = []
-        coverage = {}
-
-        for line in out.splitlines():
-            s = line.strip()
-            if not s:
-                continue
-            if s.startswith("Open"):
-                mode = "open"
-                continue
-            if s.startswith("Coverage"):
-                mode = "cov"
-                continue
-            if mode == "open":
-                open_facs = s.split()
-            if mode == "cov" and "covers:" in s:
-                fac, rest = s.split("covers:")
-                fac = fac.strip()
-                coverage[fac] = rest.strip().split()
-
-        clients, facs, cov = parse_input(case_file)
-        c = compute_total_distance(clients, facs, coverage)
-        costs.append(c)
+        _open, assign = anytime(inst, t, seed=seed, dists=dists)
+        # Report from the float64 coordinates, not the float32 search matrix
+        d = inst.client_xy - inst.facility_xy[assign]
+        costs.append(float(np.hypot(d[:, 0], d[:, 1]).sum()))
 
     return costs
 
@@ -220,56 +179,61 @@ def run_anytime(case_file, time_values, seed = 143):
 # MAIN PLOT GENERATION
 # -------------------------------------------------------------
 
-def generate_all_plots():
+def _case_id(fname):
+    """'test_case_17.txt' -> 17"""
+    return int(fname.split("_")[2].split(".")[0])
 
-    case_ids = []
-    approx_facilities = []
-    approx_costs = []
-    exact_facilities = []
-    exact_costs = []
 
-    for fname in sorted(os.listdir(TESTCASE_DIR)):
-        if not fname.startswith("test_case_"):
-            continue
+def _process_case(fname):
+    """
+    Parse one test case and its approx/exact outputs.
 
-        case_id = int(fname.split("_")[2].split(".")[0])
-        input_path = os.path.join(TESTCASE_DIR, fname)
-        approx_out = os.path.join(APPROX_OUT_DIR, fname.replace(".txt", "_out.txt"))
-        exact_out = os.path.join(EXACT_OUT_DIR, fname.replace(".txt", ".out"))
+    Returns (case_id, approx_facilities, approx_cost, exact_facilities,
+    exact_cost), or None if there is no approx output. The exact fields
+    are None when no exact output exists.
+    """
+    case_id = _case_id(fname)
+    input_path = os.path.join(TESTCASE_DIR, fname)
+    approx_out = os.path.join(APPROX_OUT_DIR, fname.replace(".txt", "_out.txt"))
+    exact_out = os.path.join(EXACT_OUT_DIR, fname.replace(".txt", ".out"))
 
-        clients, facs, cov = parse_input(input_path)
-        approx_open, approx_cov = parse_output(approx_out)
+    clients, facs, cov = parse_input(input_path)
+    approx_open, approx_cov = parse_output(approx_out)
 
-        if approx_open is None:
-            continue
+    if approx_open is None:
+        return None
+
+    a_cost = compute_total_distance(clients, facs, approx_cov)
+    a_fac = len(approx_open)
 
-        a_cost = compute_total_distance(clients, facs, approx_cov)
-        a_fac = len(approx_open)
-
-        case_ids.append(case_id)
-        approx_facilities.append(a_fac)
-        approx_costs.append(a_cost)
-
-        if os.path.exists(exact_out):
-            ex_open, ex_cov = parse_output(exact_out)
-            if ex_open is not None:
-                e_cost = compute_total_distance(clients, facs, ex_cov)
-                e_fac = len(ex_open)
-            else:
-                e_cost = None
-                e_fac = None
+    if os.path.exists(exact_out):
+        ex_open, ex_cov = parse_output(exact_out)
+        if ex_open is not None:
+            e_cost = compute_total_distance(clients, facs, ex_cov)
+            e_fac = len(ex_open)
         else:
             e_cost = None
             e_fac = None
+    else:
+        e_cost = None
+        e_fac = None
+
+    return case_id, a_fac, a_cost, e_fac, e_cost
+
 
-        exact_facilities.append(e_fac)
-        exact_costs.append(e_cost)
+def generate_all_plots():
 
-    # Sort everything by test case ID
-    zipped = sorted(
-        zip(case_ids, approx_facilities, approx_costs, exact_facilities, exact_costs)
+    # Numeric case order (test_case_2 before test_case_10); pool.map keeps it
+    fnames = sorted(
+        (fname for fname in os.listdir(TESTCASE_DIR) if fname.startswith("test_case_")),
+        key=_case_id,
     )
-    case_ids, approx_facilities, approx_costs, exact_facilities, exact_costs = zip(*zipped)
+
+    # Test cases are independent: parse and score them in parallel
+    with Pool() as pool:
+        results = [r for r in pool.map(_process_case, fnames) if r is not None]
+
+    case_ids, approx_facilities, approx_costs, exact_facilities, exact_costs = zip(*results)
 
     # ---------------------------------------------------------
     # Build subset for comparison plots: only test cases 17–42
@@ -280,7 +244,7 @@ def generate_all_plots():
     comp_approx_costs = []
     comp_exact_costs = []
 
-    for cid, af, ac, ef, ec in zipped:
+    for cid, af, ac, ef, ec in results:
         if 17 <= cid <= 42:
             comp_case_ids.append(cid)
             comp_approx_facilities.append(af)
@@ -288,74 +252,73 @@ def generate_all_plots():
             comp_approx_costs.append(ac)
             comp_exact_costs.append(ec)
 
+    # One figure, cleared and redrawn for each plot
+    fig, ax = plt.subplots(figsize=(10, 6))
+
     # ---------------------------------------------------------
     # Facilities Opened (Comparison, only 17–42)
     # ---------------------------------------------------------
     if comp_case_ids:
-        plt.figure(figsize=(10, 6))
-        plt.plot(comp_case_ids, comp_approx_facilities, "-o", label="Approx")
+        ax.clear()
+        ax.plot(comp_case_ids, comp_approx_facilities, "-o", label="Approx")
         if any(e is not None for e in comp_exact_facilities):
-            plt.plot(
+            ax.plot(
                 comp_case_ids,
                 [e for e in comp_exact_facilities],
                 "-s",
                 label="Exact",
             )
-        plt.xlabel("Test Case")
-        plt.ylabel("# Facilities")
-        plt.title("Facilities Opened: Approx vs Exact (Cases 17–42)")
-        plt.grid(True)
-        plt.legend()
-        plt.savefig(os.path.join(BASE_DIR, "plot_facilities_comparison_17_42.png"))
-        plt.close()
+        ax.set_xlabel("Test Case")
+        ax.set_ylabel("# Facilities")
+        ax.set_title("Facilities Opened: Approx vs Exact (Cases 17–42)")
+        ax.grid(True)
+        ax.legend()
+        fig.savefig(os.path.join(BASE_DIR, "plot_facilities_comparison_17_42.png"))
 
     # ---------------------------------------------------------
     # Facilities Opened (Approx Only, all cases)
     # ---------------------------------------------------------
-    plt.figure(figsize=(10, 6))
-    plt.plot(case_ids, approx_facilities, "-o")
-    plt.xlabel("Test Case #")
-    plt.ylabel("# of Facilities Opened")
-    plt.title("Number of Facilities Opened (Approx)")
-    plt.grid(True)
-    plt.savefig(os.path.join(BASE_DIR, "plot_facilities_opened.png"))
-    plt.close()
+    ax.clear()
+    ax.plot(case_ids, approx_facilities, "-o")
+    ax.set_xlabel("Test Case #")
+    ax.set_ylabel("# of Facilities Opened")
+    ax.set_title("Number of Facilities Opened (Approx)")
+    ax.grid(True)
+    fig.savefig(os.path.join(BASE_DIR, "plot_facilities_opened.png"))
 
     # ---------------------------------------------------------
     # Distance Comparison (Approx vs Exact, only 17–42)
     # ---------------------------------------------------------
     if comp_case_ids:
-        plt.figure(figsize=(10, 6))
-        plt.plot(comp_case_ids, comp_approx_costs, "-o", color="orange", label="Approx")
+        ax.clear()
+        ax.plot(comp_case_ids, comp_approx_costs, "-o", color="orange", label="Approx")
         if any(e is not None for e in comp_exact_costs):
-            plt.plot(
+            ax.plot(
                 comp_case_ids,
                 comp_exact_costs,
                 "-s",
                 color="green",
                 label="Exact",
             )
-        plt.xlabel("Test Case")
-        plt.ylabel("Total Distance")
-        plt.title("Total Assignment Distance: Approx vs Exact (Cases 17–42)")
-        plt.grid(True)
-        plt.legend()
-        plt.savefig(
+        ax.set_xlabel("Test Case")
+        ax.set_ylabel("Total Distance")
+        ax.set_title("Total Assignment Distance: Approx vs Exact (Cases 17–42)")
+        ax.grid(True)
+        ax.legend()
+        fig.savefig(
             os.path.join(BASE_DIR, "plot_total_distance_comparison_17_42.png")
         )
-        plt.close()
 
     # ---------------------------------------------------------
     # Distance (Approx Only, all cases)
     # ---------------------------------------------------------
-    plt.figure(figsize=(10, 6))
-    plt.plot(case_ids, approx_costs, "-o", color="orange")
-    plt.xlabel("Test Case #")
-    plt.ylabel("Sum of Distances")
-    plt.title("Total Assignment Distance (Approx)")
-    plt.grid(True)
-    plt.savefig(os.path.join(BASE_DIR, "plot_total_distance.png"))
-    plt.close()
+    ax.clear()
+    ax.plot(case_ids, approx_costs, "-o", color="orange")
+    ax.set_xlabel("Test Case #")
+    ax.set_ylabel("Sum of Distances")
+    ax.set_title("Total Assignment Distance (Approx)")
+    ax.grid(True)
+    fig.savefig(os.path.join(BASE_DIR, "plot_total_distance.png"))
 
     # ---------------------------------------------------------
     # ANYTIME PLOT (unchanged)
@@ -365,14 +328,15 @@ def generate_all_plots():
 
     anytime_costs = run_anytime(test_for_anytime, times)
 
-    plt.figure(figsize=(10, 6))
-    plt.plot(times, anytime_costs, "-o")
-    plt.xlabel("Allowed Time (seconds)")
-    plt.ylabel("Best Cost Found")
-    plt.title("Anytime Improvement (Approximation Improves Over Time)")
-    plt.grid(True)
-    plt.savefig(os.path.join(BASE_DIR, "plot_anytime.png"))
-    plt.close()
+    ax.clear()
+    ax.plot(times, anytime_costs, "-o")
+    ax.set_xlabel("Allowed Time (seconds)")
+    ax.set_ylabel("Best Cost Found")
+    ax.set_title("Anytime Improvement (Approximation Improves Over Time)")
+    ax.grid(True)
+    fig.savefig(os.path.join(BASE_DIR, "plot_anytime.png"))
+
+    plt.close(fig)
 
     print("All plots generated successfully!")
 
@@ -38,11 +38,17 @@ Anytime behaviour:
 
 import argparse
 import math
-import random
+import os
 import sys
 import time
-from dataclasses import dataclass
-from typing import Dict, List, Set, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Shared helpers (flp_common) live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flp_common import njit, run_restart_streams
 
 
 # ---------------------------------------------------------------------------
@@ -69,6 +75,18 @@ class Instance:
     clients: List[Client]
     facilities: List[Facility]
     coverage_distance: float
+    # Contiguous (n, 2) coordinate arrays built from the lists above, for the
+    # vectorized distance code; the dataclasses remain for names/printing.
+    cxy: np.ndarray = field(init=False, repr=False)
+    fxy: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.cxy = np.array(
+            [(c.x, c.y) for c in self.clients], dtype=np.float64
+        ).reshape(-1, 2)
+        self.fxy = np.array(
+            [(f.x, f.y) for f in self.facilities], dtype=np.float64
+        ).reshape(-1, 2)
 
 
 # ---------------------------------------------------------------------------
@@ -191,29 +209,121 @@ def euclidean(x1: float, y1: float, x2: float, y2: float) -> float:
     return math.hypot(x1 - x2, y1 - y2)
 
 
-def precompute_distances(inst: Instance) -> List[List[float]]:
+def precompute_distances(inst: Instance) -> np.ndarray:
     """
-    dist[c][f] = distance from client c to facility f.
+    dist[c, f] = distance from client c to facility f.
+
+    One NumPy broadcast over the (n_clients, n_facilities) grid; np.hypot
+    gives the same values as euclidean() pair by pair.
     """
-    dist: List[List[float]] = []
-    for c in inst.clients:
-        row = []
-        for f in inst.facilities:
-            row.append(euclidean(c.x, c.y, f.x, f.y))
-        dist.append(row)
-    return dist
+    cxy = inst.cxy
+    fxy = inst.fxy
+    return np.hypot(
+        cxy[:, 0][:, None] - fxy[:, 0][None, :],
+        cxy[:, 1][:, None] - fxy[:, 1][None, :],
+    )
 
 
 # ---------------------------------------------------------------------------
 # Randomized greedy construction
 # ---------------------------------------------------------------------------
 
+def prepare(inst: Instance) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Instance-only data for the greedy runs, computed once per instance
+    (and reusable across anytime calls on the same instance):
+
+        dist        (C, F) distance matrix
+        cover_mask  (F, C) bool, cover_mask[j, c] = dist[c, j] <= R
+        nearest     (C,) nearest facility of each client (fallback choice)
+
+    cover_mask has facilities as rows so each facility's cover set is one
+    contiguous row.
+    """
+    dist = precompute_distances(inst)
+    cover_mask = np.ascontiguousarray((dist <= inst.coverage_distance).T)
+    nearest = dist.argmin(axis=1)
+    return dist, cover_mask, nearest
+
+
 def greedy_randomized(
     inst: Instance,
-    rng: random.Random,
+    rng: np.random.Generator,
+) -> Tuple[Set[int], Dict[int, int], float, int]:
+    """
+    SINGLE randomized greedy construction; see _run.
+    """
+    return _run(*prepare(inst), rng)
+
+
+@njit
+def _greedy_njit(
+    cover_mask: np.ndarray,
+    nearest: np.ndarray,
+    beta: float,
+    rng: np.random.Generator,
+    assign: np.ndarray,
+    opened: np.ndarray,
+) -> None:
+    """
+    Compiled body of _run. Each step draws one row of standard Gumbel
+    noise (one entry per facility) from rng. Fills assign[c] (facility of
+    client c) and opened[j] in place.
+    """
+    F, C = cover_mask.shape
+    uncovered = np.ones(C, dtype=np.bool_)
+    opened[:] = False
+    assign[:] = -1
+
+    for step in range(F):
+        # Gumbel-max: argmax_j (beta * gain_j + gumbel_j) over unopened j is
+        # a sample from the softmax P(j) ∝ exp(beta * gain_j), without any
+        # exp() or cumulative scan. -log(Exp(1)) is standard Gumbel.
+        gumbel = -np.log(rng.standard_exponential(F))
+        best_gain = 0
+        chosen = -1
+        best_key = 0.0
+        for j in range(F):
+            if opened[j]:
+                continue
+            # gain_j = # uncovered clients facility j covers
+            g = 0
+            for c in range(C):
+                if uncovered[c] and cover_mask[j, c]:
+                    g += 1
+            if g > best_gain:
+                best_gain = g
+            key = beta * g + gumbel[j]
+            if chosen < 0 or key > best_key:
+                chosen = j
+                best_key = key
+
+        if best_gain == 0:
+            # no facility can cover any *new* client within R
+            break
+
+        opened[chosen] = True
+        for c in range(C):
+            if uncovered[c] and cover_mask[chosen, c]:
+                assign[c] = chosen
+                uncovered[c] = False
+
+    # Fallback: any leftover clients go to their nearest facility
+    for c in range(C):
+        if assign[c] < 0:
+            best_j = nearest[c]
+            opened[best_j] = True
+            assign[c] = best_j
+
+
+def _run(
+    dist: np.ndarray,
+    cover_mask: np.ndarray,
+    nearest: np.ndarray,
+    rng: np.random.Generator,
 ) -> Tuple[Set[int], Dict[int, int], float, int]:
     """
-    SINGLE randomized greedy construction.
+    SINGLE randomized greedy construction over data from prepare.
 
     At each step, for each unopened facility j:
       gain_j = # of currently uncovered clients it can cover (within R)
@@ -229,120 +339,129 @@ def greedy_randomized(
     Remaining uncovered clients are attached to their nearest facility
     (opening that facility if needed).
     """
-    C = len(inst.clients)
-    F = len(inst.facilities)
-    R = inst.coverage_distance
+    C, F = dist.shape
 
-    dist = precompute_distances(inst)
+    beta = 0.15  # softness; larger = more greedy, smaller = more random
 
-    # Precompute cover sets
-    cover_sets: List[Set[int]] = []
-    for j in range(F):
-        can_cover = {i for i in range(C) if dist[i][j] <= R}
-        cover_sets.append(can_cover)
+    # The kernel draws its Gumbel noise from rng one step at a time
+    assign = np.empty(C, dtype=np.int64)
+    opened = np.empty(F, dtype=np.bool_)
+    _greedy_njit(cover_mask, nearest, beta, rng, assign, opened)
 
-    uncovered: Set[int] = set(range(C))
-    open_facilities: Set[int] = set()
-    assignment: Dict[int, int] = {}
+    open_facilities = set(np.flatnonzero(opened).tolist())
+    assignment = dict(enumerate(assign.tolist()))
 
-    beta = 0.15  # softness; larger = more greedy, smaller = more random
+    # Compute total distance
+    total_dist = float(dist[np.arange(C), assign].sum())
 
-    # Greedy loop
-    while True:
-        unopened = [j for j in range(F) if j not in open_facilities]
-        if not unopened:
-            break
+    num_open = len(open_facilities)
+    return open_facilities, assignment, total_dist, num_open
 
-        gains: List[int] = []
-        best_gain = 0
-        for j in unopened:
-            g = len(uncovered & cover_sets[j])
-            gains.append(g)
-            if g > best_gain:
-                best_gain = g
 
-        if best_gain == 0:
-            # no facility can cover any *new* client within R
-            break
+def _warm_up_kernels() -> None:
+    """
+    Trigger JIT compilation on a tiny input so it is not charged against
+    the anytime time limit.
 
-        # Softmax over gains
-        weights = [math.exp(beta * g) for g in gains]
-        total_w = sum(weights)
-        r = rng.random() * total_w
-        acc = 0.0
-        chosen = unopened[-1]  # fallback
-        for j, w in zip(unopened, weights):
-            acc += w
-            if r <= acc:
-                chosen = j
-                break
+    The kernel is not cached on disk: numba's cache records the module name
+    it was compiled under, and this file is imported both as
+    facility_location_approx and as dustin_approx_sol.facility_location_approx.
+    """
+    _greedy_njit(
+        np.ones((1, 1), dtype=np.bool_), np.zeros(1, dtype=np.int64),
+        0.15, np.random.default_rng(0),
+        np.empty(1, dtype=np.int64), np.empty(1, dtype=np.bool_),
+    )
 
-        open_facilities.add(chosen)
-        newly = uncovered & cover_sets[chosen]
-        for c in newly:
-            assignment[c] = chosen
-        uncovered -= newly
 
-    # Fallback: any leftover clients go to their nearest facility
-    for c in uncovered:
-        best_j = min(range(F), key=lambda j: dist[c][j])
-        open_facilities.add(best_j)
-        assignment[c] = best_j
+# ---------------------------------------------------------------------------
+# Anytime wrapper
+# ---------------------------------------------------------------------------
 
-    # Safety: ensure all clients assigned
-    for c in range(C):
-        if c not in assignment:
-            best_j = min(range(F), key=lambda j: dist[c][j])
-            open_facilities.add(best_j)
-            assignment[c] = best_j
+def _search_until(
+    prep: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    deadline: float,
+    rng: np.random.Generator,
+) -> Tuple[Set[int], Dict[int, int], float, int]:
+    """
+    Run randomized greedy constructions until the deadline (at least one)
+    and return the best (open, assignment, total_dist, num_open) seen.
+    """
+    # First construction
+    best_open, best_assign, best_dist, best_num = _run(*prep, rng)
+    runs = 1
 
-    # Compute total distance
-    total_dist = 0.0
-    for c, j in assignment.items():
-        total_dist += dist[c][j]
+    while time.monotonic() < deadline:
+        o, a, d, k = _run(*prep, rng)
+        runs += 1
+        if (k < best_num) or (k == best_num and d < best_dist):
+            best_open, best_assign, best_dist, best_num = o, a, d, k
 
-    num_open = len(open_facilities)
-    return open_facilities, assignment, total_dist, num_open
+    # Debug if you want:
+    # print(f"[ANYTIME] runs = {runs}", file=sys.stderr)
 
+    return best_open, best_assign, best_dist, best_num
+
+
+# Per-process prepare() result, set once by _init_worker in every process
+# that runs a restart stream, so tasks do not re-send the distance matrix.
+# Under fork it is inherited.
+_worker_prep: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+
+def _init_worker(prep: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> None:
+    global _worker_prep
+    _worker_prep = prep
+    _warm_up_kernels()
+
+
+def _worker_search(
+    deadline: float,
+    seed_seq: np.random.SeedSequence,
+) -> Tuple[Set[int], Dict[int, int], float, int]:
+    return _search_until(_worker_prep, deadline, np.random.default_rng(seed_seq))
 
-# ---------------------------------------------------------------------------
-# Anytime wrapper
-# ---------------------------------------------------------------------------
 
 def anytime(
     inst: Instance,
     time_limit: float,
     seed: int | None = None,
+    workers: int = 1,
+    *,
+    prep: Tuple[np.ndarray, np.ndarray, np.ndarray] | None = None,
 ) -> Tuple[Set[int], Dict[int, int]]:
     """
     Anytime loop:
 
-    - Initialize RNG.
-    - Run randomized greedy at least once.
-    - Re-run as many times as the time limit allows.
-    - Keep the best solution seen so far.
+    - Initialize one RNG stream per worker process (default: a single
+      stream in this process), all spawned from `seed`.
+    - Each worker runs randomized greedy at least once, then re-runs it as
+      many times as the time limit allows.
+    - Keep the best solution seen over all workers.
 
     "Best" is lexicographic:
         1. fewer open facilities
         2. if tied, smaller total distance
+
+    `prep` is the result of prepare(inst); pass it when solving the same
+    instance repeatedly to skip rebuilding it.
     """
-    rng = random.Random(seed)
-    start = time.time()
-    deadline = start + time_limit
+    _warm_up_kernels()
 
-    # First construction
-    best_open, best_assign, best_dist, best_num = greedy_randomized(inst, rng)
-    runs = 1
+    workers = max(1, workers)
 
-    while time.time() < deadline:
-        o, a, d, k = greedy_randomized(inst, rng)
-        runs += 1
-        if (k < best_num) or (k == best_num and d < best_dist):
-            best_open, best_assign, best_dist, best_num = o, a, d, k
+    start = time.monotonic()
+    deadline = start + time_limit
 
-    # Debug if you want:
-    # print(f"[ANYTIME] runs = {runs}", file=sys.stderr)
+    # The instance never changes: distances and cover masks are built once
+    if prep is None:
+        prep = prepare(inst)
 
+    results = run_restart_streams(
+        _worker_search, [(deadline,)] * workers, seed, _init_worker, (prep,)
+    )
+
+    best_open, best_assign, _, _ = min(results, key=lambda r: (r[3], r[2]))
     return best_open, best_assign
 
 
@@ -372,6 +491,12 @@ def main() -> None:
         default=None,
         help="Optional explicit random seed (for reproducible experiments).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parallel restart processes (default: 1).",
+    )
     args = parser.parse_args()
 
     # Read instance
@@ -382,7 +507,9 @@ def main() -> None:
             inst = read_instance(f)
 
     # Run anytime approximation
-    open_facilities, assignment = anytime(inst, args.t, seed=args.seed)
+    open_facilities, assignment = anytime(
+        inst, args.t, seed=args.seed, workers=args.workers
+    )
 
     # Print solution
     write_solution(inst, open_facilities, assignment, out=sys.stdout)
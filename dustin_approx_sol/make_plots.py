@@ -1,8 +1,13 @@
-import math
+import argparse
 import os
-import subprocess
+import re
+from multiprocessing import Pool
 
+import matplotlib
 import matplotlib.pyplot as plt
+import numpy as np
+
+from facility_location_approx import anytime, prepare, read_instance
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TESTCASE_DIR = os.path.join(BASE_DIR, "..", "testcases")
@@ -15,104 +20,69 @@ EXACT_OUT_DIR = os.path.join(BASE_DIR, "..", "exact_solution", "realistic_test_c
 # -------------------------------------------------------------
 def parse_input(path):
     with open(path) as f:
-        data = f.read().strip().split()
-
-    it = iter(data)
-    nC = int(next(it))
-    nF = int(next(it))
-
-    clients = {}
-    for _ in range(nC):
-        name = next(it)
-        x = float(next(it))
-        y = float(next(it))
-        clients[name] = (x, y)
-
-    facs = {}
-    for _ in range(nF):
-        name = next(it)
-        x = float(next(it))
-        y = float(next(it))
-        _flag = next(it)
-        facs[name] = (x, y)
-
-    cov = float(next(it))
+        data = f.read().split()
+
+    nC = int(data[0])
+    nF = int(data[1])
+
+    # Client rows are (name, x, y), facility rows (name, x, y, flag); the
+    # coordinate columns are converted to float in one NumPy pass each.
+    end_c = 2 + 3 * nC
+    end_f = end_c + 4 * nF
+    c_rows = np.array(data[2:end_c], dtype=object).reshape(nC, 3)
+    f_rows = np.array(data[end_c:end_f], dtype=object).reshape(nF, 4)
+    c_xy = c_rows[:, 1:3].astype(float)
+    f_xy = f_rows[:, 1:3].astype(float)
+
+    # clients / facs are (name -> row index, (n, 2) coordinates) pairs
+    clients = ({name: i for i, name in enumerate(c_rows[:, 0].tolist())}, c_xy)
+    facs = ({name: j for j, name in enumerate(f_rows[:, 0].tolist())}, f_xy)
+
+    cov = float(data[end_f])
     return clients, facs, cov
 
 
 # -------------------------------------------------------------
 # Output Parsing (NEW + OLD format)
 # -------------------------------------------------------------
+# Compiled once; parse_output runs them over a whole file at a time.
+_CHOSEN_RE = re.compile(r"^[ \t]*(F\S*)(?=[^\n]* at )", re.M)
+_COVERAGE_SECTION_RE = re.compile(r"^[ \t]*(?:Coverage mapping|Unique)[^\n]*$", re.M)
+_OPEN_RE = re.compile(r"^[ \t]*Open[^\n]*\n\s*^[ \t]*(?!Coverage)(\S[^\n]*)", re.M)
+_COVERAGE_HEADER_RE = re.compile(r"^[ \t]*Coverage[^\n]*$", re.M)
+_COVERS_RE = re.compile(r"^[ \t]*(.*?)[ \t]*covers:(.*)$", re.M)
+
+
 def parse_output(path):
     if not os.path.exists(path):
         return None, None
 
     with open(path) as f:
-        lines = [ln.strip() for ln in f if ln.strip()]
+        text = f.read()
 
     # ---------- NEW FORMAT ----------
-    if any("Facilities chosen" in ln for ln in lines):
-        open_facs = []
+    chosen = text.find("Facilities chosen")
+    if chosen >= 0:
+        section = _COVERAGE_SECTION_RE.search(text, chosen)
+        open_facs = _CHOSEN_RE.findall(text, chosen, section.start() if section else len(text))
+
         coverage = {}
-        in_facility_section = False
-        in_coverage_section = False
-
-        for s in lines:
-            if "Facilities chosen" in s:
-                in_facility_section = True
-                in_coverage_section = False
-                continue
-
-            if s.startswith("Coverage mapping"):
-                in_facility_section = False
-                in_coverage_section = True
-                continue
-            
-            if s.startswith("Unique"):
-                in_facility_section = False
-                in_coverage_section = True
-                continue
-
-            # Facility list
-            if in_facility_section and s.startswith("F") and " at " in s:
-                fac = s.split()[0]
-                open_facs.append(fac)
-
-            # Coverage list
-            if in_coverage_section and "covers:" in s:
-                fac, rest = s.split("covers:")
-                fac = fac.strip()
+        if section:
+            for fac, rest in _COVERS_RE.findall(text, section.end()):
                 rest = rest.strip()
-                if rest == "(none)":
-                    coverage[fac] = []
-                else:
-                    coverage[fac] = [c.strip() for c in rest.split(",")]
-
+                coverage[fac] = [] if rest == "(none)" else [c.strip() for c in rest.split(",")]
         return open_facs, coverage
 
     # ---------- OLD FORMAT ----------
-    open_facs = []
+    m = _OPEN_RE.search(text)
+    open_facs = m.group(1).split() if m else []
+
     coverage = {}
-    mode = None
-
-    for s in lines:
-        if s.startswith("Open"):
-            mode = "open"
-            continue
-        if s.startswith("Coverage"):
-            mode = "cov"
-            continue
-        if mode == "open":
-            open_facs = s.split()
-        elif mode == "cov" and "covers:" in s:
-            fac, rest = s.split("covers:")
-            fac = fac.strip()
+    section = _COVERAGE_HEADER_RE.search(text, m.end() if m else 0)
+    if section:
+        for fac, rest in _COVERS_RE.findall(text, section.end()):
             rest = rest.strip()
-            if rest == "(none)":
-                coverage[fac] = []
-            else:
-                coverage[fac] = rest.split()
-
+            coverage[fac] = [] if rest == "(none)" else rest.split()
     return open_facs, coverage
 
 
@@ -120,13 +90,21 @@ def parse_output(path):
 # Distance Computation
 # -------------------------------------------------------------
 def compute_total_distance(clients, facs, coverage):
-    total = 0.0
+    # Translate every assignment to (facility row, client row) once, then
+    # index the coordinate arrays and take one vectorized hypot.
+    client_index, client_xy = clients
+    fac_index, fac_xy = facs
+
+    fac_rows = []
+    client_rows = []
     for fac, client_list in coverage.items():
-        fx, fy = facs[fac]
-        for c in client_list:
-            cx, cy = clients[c]
-            total += math.dist((fx, fy), (cx, cy))
-    return total
+        fac_rows.extend([fac_index[fac]] * len(client_list))
+        client_rows.extend(map(client_index.__getitem__, client_list))
+
+    if not client_rows:
+        return 0.0
+    d = fac_xy[fac_rows] - client_xy[client_rows]
+    return float(np.hypot(d[:, 0], d[:, 1]).sum())
 
 
 # -------------------------------------------------------------
@@ -135,29 +113,19 @@ def compute_total_distance(clients, facs, coverage):
 def run_anytime(case_file, time_values):
     """Runs the approx solver repeatedly for increasing times."""
 
+    # Solve in-process: the instance is parsed and its distance matrix and
+    # cover masks built once, then shared by every time value.
+    with open(case_file, encoding="utf-8") as f:
+        inst = read_instance(f)
+    prep = prepare(inst)
+    dist = prep[0]
+
     costs = []
     for t in time_values:
-        cmd = [
-            "python3",
-            os.path.join(BASE_DIR, "facility_location_approx.py"),
-            "-t", str(t),
-            case_file
-        ]
-
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        out, _ = proc.communicate()
-        out = out.decode()
-
-        temp_path = "_tmp_any_time_parse.txt"
-        with open(temp_path, "w") as f:
-            f.write(out)
-
-        open_facs, coverage = parse_output(temp_path)
-        os.remove(temp_path)
-
-        clients, facs, _ = parse_input(case_file)
-        cost = compute_total_distance(clients, facs, coverage)
-        costs.append(cost)
+        _open, assignment = anytime(inst, t, prep=prep)
+        rows = np.fromiter(assignment.keys(), dtype=np.intp)
+        cols = np.fromiter(assignment.values(), dtype=np.intp)
+        costs.append(float(dist[rows, cols].sum()))
 
     return costs
 
@@ -165,57 +133,60 @@ def run_anytime(case_file, time_values):
 # -------------------------------------------------------------
 # MAIN: Generate All Plots
 # -------------------------------------------------------------
-def generate_all_plots():
+def _case_id(fname):
+    """'test_case_17.txt' -> 17"""
+    return int(fname.split("_")[2].split(".")[0])
 
-    case_ids = []
-    approx_facilities = []
-    approx_costs = []
-    exact_facilities = []
-    exact_costs = []
 
-    # ------------------------
-    # Load data for all cases
-    # ------------------------
-    for fname in sorted(os.listdir(TESTCASE_DIR)):
-        if not fname.startswith("test_case_") or not fname.endswith(".txt"):
-            continue
-
-        case_id = int(fname.split("_")[2].split(".")[0])
-        input_path = os.path.join(TESTCASE_DIR, fname)
-        approx_out = os.path.join(APPROX_OUT_DIR, fname.replace(".txt", "_out.txt"))
-        exact_out = os.path.join(EXACT_OUT_DIR, f"test_case_{case_id}.out")
-
-        clients, facs, _ = parse_input(input_path)
-        approx_open, approx_cov = parse_output(approx_out)
-
-        if approx_open is None:
-            continue
-
-        # FIX → USE TOTAL DISTANCE (not radius)
-        approx_cost = compute_total_distance(clients, facs, approx_cov)
-        approx_num = len(approx_open)
-
-        case_ids.append(case_id)
-        approx_facilities.append(approx_num)
-        approx_costs.append(approx_cost)
-
-        if os.path.exists(exact_out):
-            ex_open, ex_cov = parse_output(exact_out)
-            # FIX → USE TOTAL DISTANCE
-            exact_cost = compute_total_distance(clients, facs, ex_cov)
-            exact_num = len(ex_open)
-        else:
-            exact_cost = None
-            exact_num = None
+def _process_case(fname):
+    """
+    Load one test case: (case_id, approx_num, approx_cost, exact_num,
+    exact_cost), or None if it has no approx output.
+    """
+    case_id = _case_id(fname)
+    input_path = os.path.join(TESTCASE_DIR, fname)
+    approx_out = os.path.join(APPROX_OUT_DIR, fname.replace(".txt", "_out.txt"))
+    exact_out = os.path.join(EXACT_OUT_DIR, f"test_case_{case_id}.out")
+
+    clients, facs, _ = parse_input(input_path)
+    approx_open, approx_cov = parse_output(approx_out)
+
+    if approx_open is None:
+        return None
+
+    # FIX → USE TOTAL DISTANCE (not radius)
+    approx_cost = compute_total_distance(clients, facs, approx_cov)
+    approx_num = len(approx_open)
 
-        exact_facilities.append(exact_num)
-        exact_costs.append(exact_cost)
+    if os.path.exists(exact_out):
+        ex_open, ex_cov = parse_output(exact_out)
+        # FIX → USE TOTAL DISTANCE
+        exact_cost = compute_total_distance(clients, facs, ex_cov)
+        exact_num = len(ex_open)
+    else:
+        exact_cost = None
+        exact_num = None
 
-    # Sort
-    zipped = sorted(
-        zip(case_ids, approx_facilities, approx_costs, exact_facilities, exact_costs)
+    return case_id, approx_num, approx_cost, exact_num, exact_cost
+
+
+def generate_all_plots(show=False):
+
+    # ------------------------
+    # Load data for all cases (in parallel, one task per case)
+    # ------------------------
+    # Numeric case order (test_case_2 before test_case_10); pool.map keeps it
+    fnames = sorted(
+        (
+            fname for fname in os.listdir(TESTCASE_DIR)
+            if fname.startswith("test_case_") and fname.endswith(".txt")
+        ),
+        key=_case_id,
     )
-    case_ids, approx_facilities, approx_costs, exact_facilities, exact_costs = zip(*zipped)
+    with Pool() as pool:
+        results = [r for r in pool.map(_process_case, fnames) if r is not None]
+
+    case_ids, approx_facilities, approx_costs, exact_facilities, exact_costs = zip(*results)
 
     # ------------------------------------------------------------
     # APPROX vs EXACT — ONLY CASES 17 THROUGH 42
@@ -229,50 +200,63 @@ def generate_all_plots():
     approx_cost_sel = [approx_costs[i] for i in selected_indices]
     exact_cost_sel = [exact_costs[i] for i in selected_indices]
 
+    # One figure, cleared and redrawn for each plot. With show=True every
+    # plot gets its own figure instead: a closed window can't be reused.
+    fig = ax = None
+
+    def next_axes():
+        nonlocal fig, ax
+        if show or fig is None:
+            fig, ax = plt.subplots(figsize=(10, 6))
+        else:
+            ax.clear()
+        return ax
+
+    def finish(filename):
+        fig.savefig(os.path.join(BASE_DIR, filename))
+        if show:
+            plt.show()
+
     # -------- Facility Count Comparison --------
-    plt.figure(figsize=(10, 6))
-    plt.plot(case_ids_sel, approx_fac_sel, '-o', label="Approximation")
-    plt.plot(case_ids_sel, exact_fac_sel, '-s', label="Exact")
-    plt.title("Facilities Opened (Cases 17–42): Approx vs Exact")
-    plt.xlabel("Test Cases 17-42")
-    plt.ylabel("# Facilities")
-    plt.grid(True)
-    plt.legend()
-    plt.savefig(os.path.join(BASE_DIR, "plot_facilities_comparison.png"))
-    plt.show()
+    ax = next_axes()
+    ax.plot(case_ids_sel, approx_fac_sel, '-o', label="Approximation")
+    ax.plot(case_ids_sel, exact_fac_sel, '-s', label="Exact")
+    ax.set_title("Facilities Opened (Cases 17–42): Approx vs Exact")
+    ax.set_xlabel("Test Cases 17-42")
+    ax.set_ylabel("# Facilities")
+    ax.grid(True)
+    ax.legend()
+    finish("plot_facilities_comparison.png")
 
     # -------- TOTAL DISTANCE Comparison --------
-    plt.figure(figsize=(10, 6))
-    plt.plot(case_ids_sel, approx_cost_sel, '-o', color="orange", label="Approximation")
-    plt.plot(case_ids_sel, exact_cost_sel, '-s', color="green", label="Exact")
-    plt.title("Total Distance (Cases 17–42): Approx vs Exact")
-    plt.xlabel("Test Cases 17-42")
-    plt.ylabel("Total Assignment Distance")
-    plt.grid(True)
-    plt.legend()
-    plt.savefig(os.path.join(BASE_DIR, "plot_total_distance_comparison.png"))
-    plt.show()
+    ax = next_axes()
+    ax.plot(case_ids_sel, approx_cost_sel, '-o', color="orange", label="Approximation")
+    ax.plot(case_ids_sel, exact_cost_sel, '-s', color="green", label="Exact")
+    ax.set_title("Total Distance (Cases 17–42): Approx vs Exact")
+    ax.set_xlabel("Test Cases 17-42")
+    ax.set_ylabel("Total Assignment Distance")
+    ax.grid(True)
+    ax.legend()
+    finish("plot_total_distance_comparison.png")
 
     # ------------------------------------------
     # FULL 50 — APPROX ONLY
     # ------------------------------------------
-    plt.figure(figsize=(10, 6))
-    plt.plot(case_ids, approx_facilities, '-o')
-    plt.title("Number of Facilities Opened (Approx Only)")
-    plt.xlabel("Test Cases 1-50")
-    plt.ylabel("# Facilities Opened")
-    plt.grid(True)
-    plt.savefig(os.path.join(BASE_DIR, "plot_facilities_opened.png"))
-    plt.show()
-
-    plt.figure(figsize=(10, 6))
-    plt.plot(case_ids, approx_costs, '-o', color="orange")
-    plt.title("Total Assignment Distance (Approx Only)")
-    plt.xlabel("Test Case 1-50")
-    plt.ylabel("Sum of Distances")
-    plt.grid(True)
-    plt.savefig(os.path.join(BASE_DIR, "plot_total_distance.png"))
-    plt.show()
+    ax = next_axes()
+    ax.plot(case_ids, approx_facilities, '-o')
+    ax.set_title("Number of Facilities Opened (Approx Only)")
+    ax.set_xlabel("Test Cases 1-50")
+    ax.set_ylabel("# Facilities Opened")
+    ax.grid(True)
+    finish("plot_facilities_opened.png")
+
+    ax = next_axes()
+    ax.plot(case_ids, approx_costs, '-o', color="orange")
+    ax.set_title("Total Assignment Distance (Approx Only)")
+    ax.set_xlabel("Test Case 1-50")
+    ax.set_ylabel("Sum of Distances")
+    ax.grid(True)
+    finish("plot_total_distance.png")
 
     # ------------------------------------------
     # ANYTIME IMPROVEMENT PLOT
@@ -281,17 +265,28 @@ def generate_all_plots():
     times = [0.1, 0.2, 0.4, 0.8, 1.6, 3.2, 5.0]
     anytime_costs = run_anytime(test_for_anytime, times)
 
-    plt.figure(figsize=(10, 6))
-    plt.plot(times, anytime_costs, '-o')
-    plt.title("Anytime Improvement (Approximation Improves Over Time)")
-    plt.xlabel("Allowed Time (seconds)")
-    plt.ylabel("Best Cost Found")
-    plt.grid(True)
-    plt.savefig(os.path.join(BASE_DIR, "plot_anytime.png"))
-    plt.show()
+    ax = next_axes()
+    ax.plot(times, anytime_costs, '-o')
+    ax.set_title("Anytime Improvement (Approximation Improves Over Time)")
+    ax.set_xlabel("Allowed Time (seconds)")
+    ax.set_ylabel("Best Cost Found")
+    ax.grid(True)
+    finish("plot_anytime.png")
+
+    plt.close(fig)
 
     print("All plots generated!")
 
 
 if __name__ == "__main__":
-    generate_all_plots()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate the approx/exact comparison plots.")
+    parser.add_argument(
+        "--show",
+        action="store_true",
+        help="Also display each plot interactively (needs a GUI backend).",
+    )
+    args = parser.parse_args()
+
+    if not args.show:
+        matplotlib.use("Agg")  # files only; no GUI toolkit needed
+    generate_all_plots(show=args.show)
\ No newline at end of file
@@ -1,7 +1,13 @@
 import random
 import time
 import matplotlib.pyplot as plt
-from facility_location_exact import solve_exact, distance
+from facility_location_exact import (
+    _warm_up_kernels,
+    coordinates,
+    coverage_threshold2,
+    solve_exact,
+    squared_distance_matrix,
+)
 
 # --- Parameters ---
 customer_count = 5  # fixed number of customers
@@ -19,8 +25,10 @@ def generate_test_case(num_facilities, num_customers):
     customers = [(f"C{i+1}", random.uniform(0, 100), random.uniform(0, 100)) for i in range(num_customers)]
     
     # Ensure feasibility: every customer within coverage of at least one facility
-    for i, (cx, cy) in enumerate([(c[1], c[2]) for c in customers]):
-        if min([distance((cx, cy), (f[1], f[2])) for f in facilities]) > coverage:
+    nearest2 = squared_distance_matrix(coordinates(customers), coordinates(facilities)).min(axis=1)
+    coverage2 = coverage_threshold2(coverage)
+    for i in range(num_customers):
+        if nearest2[i] > coverage2:
             # Move customer closer to first facility
             fx, fy = facilities[0][1], facilities[0][2]
             customers[i] = (customers[i][0], fx + random.uniform(-coverage/2, coverage/2),
@@ -28,6 +36,9 @@ def generate_test_case(num_facilities, num_customers):
     return facilities, customers
 
 # --- Benchmark ---
+# Compile the search kernels up front so the first point times the search,
+# not numba.
+_warm_up_kernels()
 for f in facility_sizes:
     print(f"Running solver for {f} facilities...")
     facilities, customers = generate_test_case(f, customer_count)
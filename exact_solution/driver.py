@@ -1,44 +1,74 @@
+import argparse
 import time
 import csv
 import os
-from exact_solution.facility_location_exact import read_input, solve_flp
+from concurrent.futures import ProcessPoolExecutor
+from facility_location_exact import _warm_up_kernels, parse_input, solve_exact
 
 INPUT_DIR = "flp_test_inputs"   
 OUTPUT_CSV = "results.csv"
 
-def main():
-    input_files = sorted(
-        [f for f in os.listdir(INPUT_DIR) if f.endswith(".txt")]
-    )
+def run_one(full_path):
+    """Solve one input file; returns its CSV row."""
+    print(f"Running {os.path.basename(full_path)}...", flush=True)
 
-    results = []
+    # Read input
+    customers, facilities, coverage_dist = parse_input(full_path)
 
-    print(f"Found {len(input_files)} input files. Starting tests...\n")
+    # Time solver
+    start = time.time()
+    _, _, total_dist, num_open = solve_exact(customers, facilities, coverage_dist)
+    end = time.time()
 
-    for fname in input_files:
-        full_path = os.path.join(INPUT_DIR, fname)
-        print(f"Running {fname}...")
+    elapsed = end - start
 
-        # Read input
-        facilities, customers = read_input(full_path)
+    return [
+        os.path.basename(full_path),
+        len(facilities),
+        len(customers),
+        total_dist,
+        num_open,
+        elapsed
+    ]
 
-        # Time solver
-        start = time.time()
-        best_cost, best_set = solve_flp(facilities, customers)
-        end = time.time()
 
-        elapsed = end - start
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the exact solver on every .txt input in a directory."
+    )
+    parser.add_argument(
+        "--input-dir",
+        default=INPUT_DIR,
+        help=f"Directory of input files (default: {INPUT_DIR}).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Files solved in parallel (default: 1, so runtimes are not "
+             "measured while files compete for cores).",
+    )
+    args = parser.parse_args()
+
+    input_files = sorted(
+        [f for f in os.listdir(args.input_dir) if f.endswith(".txt")]
+    )
+    paths = [os.path.join(args.input_dir, f) for f in input_files]
 
-        print(f"  Finished {fname}: {elapsed:.3f} seconds")
+    print(f"Found {len(input_files)} input files. Starting tests...\n")
 
-        results.append([
-            fname,
-            len(facilities),
-            len(customers),
-            best_cost,
-            len(best_set),
-            elapsed
-        ])
+    # Files are independent: with --workers > 1 they are solved in parallel,
+    # one per worker at a time. Each worker compiles the kernels before its
+    # first timed solve.
+    with ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_warm_up_kernels
+    ) as ex:
+        results = []
+        # map yields rows in file order as they finish, so progress is live
+        for row in ex.map(run_one, paths, chunksize=1):
+            fname, *_, elapsed = row
+            print(f"  Finished {fname}: {elapsed:.3f} seconds", flush=True)
+            results.append(row)
 
     # Write CSV
     with open(OUTPUT_CSV, "w", newline="") as f:
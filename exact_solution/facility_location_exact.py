@@ -1,7 +1,13 @@
-import itertools
 import math
+import os
 import sys
 
+import numpy as np
+
+# Shared helpers (flp_common) live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flp_common import coverage_threshold2, njit
+
 
 def distance(a, b):
     return math.sqrt((a[0] - b[0])**2 + (a[1] - b[1])**2)
@@ -9,72 +15,297 @@ def distance(a, b):
 
 def parse_input(filename):
     with open(filename, "r") as f:
-        lines = [line.strip() for line in f if line.strip()]
+        data = f.read().split()
 
     # first line: number of clients, number of facilities
-    n_clients, n_facilities = map(int, lines[0].split())
-
-    clients = []
-    facilities = []
+    n_clients, n_facilities = int(data[0]), int(data[1])
 
-    idx = 1
+    # Client rows are (name, x, y), facility rows (name, x, y, flag); the
+    # coordinate columns are converted to float in one NumPy pass each.
+    end_c = 2 + 3 * n_clients
+    end_f = end_c + 4 * n_facilities
+    c_rows = np.array(data[2:end_c], dtype=object).reshape(n_clients, 3)
+    f_rows = np.array(data[end_c:end_f], dtype=object).reshape(n_facilities, 4)
 
-    # read clients
-    for _ in range(n_clients):
-        name, x, y = lines[idx].split()
-        clients.append((name, float(x), float(y)))
-        idx += 1
-
-    # read facilities
-    for _ in range(n_facilities):
-        name, x, y, flag = lines[idx].split()
-        facilities.append((name, float(x), float(y)))
-        idx += 1
+    clients = list(zip(c_rows[:, 0].tolist(), *c_rows[:, 1:3].astype(float).T.tolist()))
+    facilities = list(zip(f_rows[:, 0].tolist(), *f_rows[:, 1:3].astype(float).T.tolist()))
 
     # coverage distance
-    coverage_dist = float(lines[idx])
+    coverage_dist = float(data[end_f])
 
     return clients, facilities, coverage_dist
 
 
-def all_clients_covered(facilities_subset, clients, coverage_dist):
-    """Check if all clients are within coverage_dist of at least one selected facility."""
-    for cname, cx, cy in clients:
-        covered = False
-        for fname, fx, fy in facilities_subset:
-            if distance((cx, cy), (fx, fy)) <= coverage_dist:
-                covered = True
-                break
-        if not covered:
-            return False
-    return True
+def coordinates(points):
+    """(name, x, y) tuples -> (n, 2) float array of their coordinates."""
+    return np.array([(x, y) for _, x, y in points], dtype=float).reshape(-1, 2)
+
 
+def squared_distance_matrix(client_xy, fac_xy):
+    """dist2[c, f] = distance(client c, facility f)**2, for all pairs at once."""
+    dx = client_xy[:, 0][:, None] - fac_xy[:, 0][None, :]
+    dy = client_xy[:, 1][:, None] - fac_xy[:, 1][None, :]
+    return dx * dx + dy * dy
 
-def assign_clients_to_facilities(clients, selected, coverage_dist):
+
+def coverage_masks(dist2, coverage2):
     """
-    Assign each client to EXACTLY ONE facility (the closest one in range).
-    Returns (assignment_dict, total_distance)
+    masks[f] = bitmask of the clients facility f covers, as a row of
+    uint64 words: bit c % 64 of word c // 64 is set when
+    dist2[c, f] <= coverage2.
+    """
+    cover = dist2 <= coverage2
+    n_words = max(1, -(-cover.shape[0] // 64))
+    packed = np.packbits(cover.T, axis=1, bitorder="little")
+    packed = np.pad(packed, ((0, 0), (0, 8 * n_words - packed.shape[1])))
+    return np.ascontiguousarray(packed).view("<u8").astype(np.uint64)
+
+
+def full_mask(n_clients):
+    """Word mask with the bits of all n_clients clients set."""
+    n_words = max(1, -(-n_clients // 64))
+    bits = np.zeros(64 * n_words, dtype=bool)
+    bits[:n_clients] = True
+    return np.packbits(bits, bitorder="little").view("<u8").astype(np.uint64)
+
+
+# Bit-twiddling constants are uint64 so mask arithmetic stays unsigned;
+# mixing uint64 with plain int literals would promote to float64.
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_ONE = np.uint64(1)
+_TWO = np.uint64(2)
+_FOUR = np.uint64(4)
+_EIGHT = np.uint64(8)
+_SIXTEEN = np.uint64(16)
+_THIRTY_TWO = np.uint64(32)
+_LOW_7 = np.uint64(0x7F)
+
+
+@njit
+def _popcount(x):
+    """Set bits in one uint64 word (SWAR, no multiply so nothing overflows)."""
+    x = x - ((x >> _ONE) & _M1)
+    x = (x & _M2) + ((x >> _TWO) & _M2)
+    x = (x + (x >> _FOUR)) & _M4
+    x = x + (x >> _EIGHT)
+    x = x + (x >> _SIXTEEN)
+    x = x + (x >> _THIRTY_TWO)
+    return int(x & _LOW_7)
+
+
+@njit
+def _gain(masks, f, uncovered):
+    """Number of uncovered clients facility f covers."""
+    n = 0
+    for w in range(uncovered.shape[0]):
+        n += _popcount(masks[f, w] & uncovered[w])
+    return n
+
+
+@njit
+def _count(bits):
+    n = 0
+    for w in range(bits.shape[0]):
+        n += _popcount(bits[w])
+    return n
+
+
+@njit
+def _greedy_cover_njit(masks, full):
+    """
+    Number of facilities the greedy set-cover heuristic opens: always take
+    the facility covering the most still-uncovered clients. This is an
+    upper bound on the optimum, used to seed the branch-and-bound.
+    """
+    uncovered = full.copy()
+    count = 0
+    while _count(uncovered) > 0:
+        best_f = 0
+        best_gain = -1
+        for f in range(masks.shape[0]):
+            g = _gain(masks, f, uncovered)
+            if g > best_gain:
+                best_f = f
+                best_gain = g
+        uncovered &= ~masks[best_f]
+        count += 1
+    return count
+
+
+@njit
+def _bnb_njit(masks, cover_ptr, cover_fac, uncovered, depth, best):
+    """
+    Branch-and-bound for the smallest number of facilities covering the
+    clients in uncovered; best[0] holds the incumbent.
+
+    Each node branches on the uncovered client with the fewest covering
+    facilities, and is pruned once depth + ceil(uncovered / best gain)
+    can't beat the incumbent.
+    """
+    n_uncovered = _count(uncovered)
+    if n_uncovered == 0:
+        best[0] = min(best[0], depth)
+        return
+
+    gain = 0
+    for f in range(masks.shape[0]):
+        gain = max(gain, _gain(masks, f, uncovered))
+    if depth + (n_uncovered + gain - 1) // gain >= best[0]:
+        return
+
+    branch = -1
+    fewest = masks.shape[0] + 1
+    for c in range(cover_ptr.shape[0] - 1):
+        if (uncovered[c >> 6] >> np.uint64(c & 63)) & _ONE:
+            k = cover_ptr[c + 1] - cover_ptr[c]
+            if k < fewest:
+                branch = c
+                fewest = k
+
+    cand = cover_fac[cover_ptr[branch]:cover_ptr[branch + 1]]
+    gains = np.empty(cand.shape[0], dtype=np.int64)
+    for i in range(cand.shape[0]):
+        gains[i] = -_gain(masks, cand[i], uncovered)
+    for i in np.argsort(gains, kind="mergesort"):
+        _bnb_njit(masks, cover_ptr, cover_fac, uncovered & ~masks[cand[i]], depth + 1, best)
+
+
+@njit
+def _first_cover_njit(masks, full, r, picked):
+    """
+    Depth-first scan of r-subsets in itertools.combinations order; fills
+    picked with the first whose masks OR to full and returns True, or
+    returns False if there is none. A prefix is abandoned once some
+    uncovered client has no facility left after it, or the picks left,
+    each covering at most the best remaining facility's share, can't
+    reach every client.
+    """
+    n_fac, n_words = masks.shape
+    suffix = np.zeros((n_fac + 1, n_words), dtype=np.uint64)
+    for f in range(n_fac - 1, -1, -1):
+        suffix[f] = suffix[f + 1] | masks[f]
+    covered = np.zeros((r + 1, n_words), dtype=np.uint64)
+
+    d = 0
+    picked[0] = -1
+    while d >= 0:
+        f = picked[d] + 1
+        if f > n_fac - (r - d):
+            d -= 1
+            continue
+        picked[d] = f
+        covered[d + 1] = covered[d] | masks[f]
+        uncovered = full & ~covered[d + 1]
+        left = r - d - 1
+
+        if left == 0:
+            if _count(uncovered) == 0:
+                return True
+            continue
+        if _count(uncovered & ~suffix[f + 1]) > 0:
+            continue
+        gain = 0
+        for g in range(f + 1, n_fac):
+            gain = max(gain, _gain(masks, g, uncovered))
+        if left * gain < _count(uncovered):
+            continue
+
+        d += 1
+        picked[d] = f
+    return False
+
+
+def dominated_facilities(masks):
     """
-    assignment = {fac[0]: [] for fac in selected}
-    total_dist = 0.0
+    dominated[i] is True when some other facility covers every client i
+    does. Of facilities with identical coverage, only the first is kept.
+    Dropping them never changes the minimum number of facilities needed.
+    """
+    # subset[i, j]: facility i covers no client that facility j misses
+    subset = ~(masks[:, None, :] & ~masks[None, :, :]).any(axis=2)
+    np.fill_diagonal(subset, False)
+    earlier = np.tri(len(masks), k=-1, dtype=bool)  # earlier[i, j] = j < i
+    return (subset & (~subset.T | earlier)).any(axis=1)
+
+
+def min_cover_count(masks, n_clients):
+    """
+    Smallest number of facilities whose coverage masks OR to every
+    client, or None if some client can't be covered at all.
+    """
+    full = full_mask(n_clients)
+    union = np.bitwise_or.reduce(masks, axis=0) if len(masks) else np.zeros_like(full)
+    if np.any(union != full):
+        return None
 
-    for cname, cx, cy in clients:
-        best_fac = None
-        best_dist = float("inf")
+    # Only undominated facilities need to be branched on
+    masks = np.ascontiguousarray(masks[~dominated_facilities(masks)])
 
-        for fname, fx, fy in selected:
-            d = distance((cx, cy), (fx, fy))
-            if d <= coverage_dist and d < best_dist:
-                best_dist = d
-                best_fac = fname
+    # cover_fac[cover_ptr[c]:cover_ptr[c + 1]] = facilities covering client c
+    bits = np.unpackbits(masks.view(np.uint8), axis=1, bitorder="little")[:, :n_clients]
+    clients_of, cover_fac = np.nonzero(bits.T)
+    cover_ptr = np.zeros(n_clients + 1, dtype=np.int64)
+    np.cumsum(np.bincount(clients_of, minlength=n_clients), out=cover_ptr[1:])
+
+    best = np.array([_greedy_cover_njit(masks, full)], dtype=np.int64)
+    _bnb_njit(masks, cover_ptr, cover_fac.astype(np.int64), full, 0, best)
+    return int(best[0])
+
+
+def first_cover_of_size(masks, n_clients, r):
+    """
+    Indices of the first r-facility subset, in itertools.combinations
+    order, whose coverage masks OR to every client, or None if there is
+    none.
+    """
+    picked = np.empty(r, dtype=np.int64)
+    if not _first_cover_njit(masks, full_mask(n_clients), r, picked):
+        return None
+    return tuple(picked.tolist())
 
-        if best_fac is None:
-            raise ValueError(f"Client {cname} cannot be assigned to any chosen facility.")
 
-        assignment[best_fac].append(cname)
-        total_dist += best_dist
+def _warm_up_kernels():
+    """
+    Trigger JIT compilation on a tiny input so it is not charged to the
+    first timed solve.
+
+    The kernels are not cached on disk: numba's cache records the module
+    name they were compiled under, and this file is imported both as
+    facility_location_exact and as exact_solution.facility_location_exact.
+    """
+    masks = np.ones((1, 1), dtype=np.uint64)
+    full = np.ones(1, dtype=np.uint64)
+    cover_ptr = np.array([0, 1], dtype=np.int64)
+    cover_fac = np.zeros(1, dtype=np.int64)
+    _greedy_cover_njit(masks, full)
+    _bnb_njit(masks, cover_ptr, cover_fac, full, 0, np.array([2], dtype=np.int64))
+    _first_cover_njit(masks, full, 1, np.empty(1, dtype=np.int64))
+
+
+def assign_clients_to_facilities(clients, facilities, subset_idx, dist2, coverage2):
+    """
+    Assign each client to EXACTLY ONE facility (the closest one in range)
+    among facilities[subset_idx], reading squared distances from dist2.
+    Returns (assignment_dict, total_distance)
+    """
+    subset_idx = np.asarray(subset_idx, dtype=np.intp)
+    in_range = np.where(dist2[:, subset_idx] <= coverage2, dist2[:, subset_idx], np.inf)
+    nearest = in_range.argmin(axis=1)
+    nearest_dist2 = in_range[np.arange(len(clients)), nearest]
+
+    if np.isinf(nearest_dist2).any():
+        cname = clients[int(np.argmax(np.isinf(nearest_dist2)))][0]
+        raise ValueError(f"Client {cname} cannot be assigned to any chosen facility.")
 
-    return assignment, total_dist
+    # Client lists keep input order; ties go to the earlier selected facility
+    names = np.array([c[0] for c in clients], dtype=object)
+    assignment = {
+        facilities[f][0]: names[nearest == k].tolist() for k, f in enumerate(subset_idx.tolist())
+    }
+    # The only square roots: one per client, for the reported total
+    return assignment, float(np.sqrt(nearest_dist2).sum())
 
 
 def solve_exact(clients, facilities, coverage_dist):
@@ -88,28 +319,30 @@ def solve_exact(clients, facilities, coverage_dist):
     best_assignments = None
     best_distance = None
 
-    # Check all subsets of facilities, starting from smallest
-    for r in range(1, len(facilities) + 1):
-        for subset in itertools.combinations(facilities, r):
-            if all_clients_covered(subset, clients, coverage_dist):
-                # Found a valid solution with r facilities
-                if r < best_count:
-                    best_count = r
-                    best_solution = subset
-                    
-                    # Calculate assignments and distance for reporting
-                    try:
-                        assignments, total_dist = assign_clients_to_facilities(
-                            clients, subset, coverage_dist
-                        )
-                        best_assignments = assignments
-                        best_distance = total_dist
-                    except ValueError:
-                        continue
-        
-        # Once we find a solution with r facilities, no need to check larger r
-        if best_solution is not None:
-            break
+    # Every pairwise distance and coverage decision once, up front
+    dist2 = squared_distance_matrix(coordinates(clients), coordinates(facilities))
+    coverage2 = coverage_threshold2(coverage_dist)
+    masks = coverage_masks(dist2, coverage2)
+
+    r = min_cover_count(masks, len(clients))
+    if r is None:
+        return best_solution, best_assignments, best_distance, best_count
+
+    # Report the first covering subset of the optimal size, in the same
+    # order a level-by-level scan of the combinations would find it
+    subset_idx = first_cover_of_size(masks, len(clients), max(r, 1))
+    if subset_idx is not None:
+        subset = tuple(facilities[i] for i in subset_idx)
+        best_count = len(subset)
+        best_solution = subset
+
+        # Calculate assignments and distance for reporting
+        try:
+            best_assignments, best_distance = assign_clients_to_facilities(
+                clients, facilities, subset_idx, dist2, coverage2
+            )
+        except ValueError:
+            pass
 
     return best_solution, best_assignments, best_distance, best_count
 
@@ -1,37 +1,34 @@
-import random
 import os
 
+import numpy as np
+
 os.makedirs("realistic_test_cases", exist_ok=True)
 
+rng = np.random.default_rng()
+
 def generate_test_case(filename, n_clients, n_facilities, coverage):
-    clients = []
-    for i in range(1, n_clients+1):
-        x = round(random.uniform(0, 100),2)
-        y = round(random.uniform(0, 100),2)
-        clients.append((f"C{i}", x, y))
-
-    facilities = []
-    for i in range(1, n_facilities+1):
-        x = round(random.uniform(0, 100),2)
-        y = round(random.uniform(0, 100),2)
-        facilities.append((f"F{i}", x, y, 0))
+    clients = np.round(rng.uniform(0, 100, (n_clients, 2)), 2)
+    facilities = np.round(rng.uniform(0, 100, (n_facilities, 2)), 2)
 
     # Ensure feasibility: each client must be within coverage of at least one facility
     # Simple way: increase coverage if needed (guaranteed feasible)
-    max_dist = 0
-    for cx, cy in [(c[1], c[2]) for c in clients]:
-        min_d = min([((cx-f[1])**2 + (cy-f[2])**2)**0.5 for f in facilities])
-        if min_d > max_dist:
-            max_dist = min_d
+    diff = clients[:, None, :] - facilities[None, :, :]
+    max_dist = np.sqrt((diff * diff).sum(axis=2)).min(axis=1).max()
     if coverage < max_dist:
-        coverage = round(max_dist + 1.0, 2)
+        coverage = round(float(max_dist) + 1.0, 2)
+
+    client_rows = np.empty((n_clients, 3), dtype=object)
+    client_rows[:, 0] = [f"C{i}" for i in range(1, n_clients + 1)]
+    client_rows[:, 1:] = clients
+    fac_rows = np.empty((n_facilities, 4), dtype=object)
+    fac_rows[:, 0] = [f"F{i}" for i in range(1, n_facilities + 1)]
+    fac_rows[:, 1:3] = facilities
+    fac_rows[:, 3] = 0
 
     with open(filename, "w") as f:
         f.write(f"{n_clients} {n_facilities}\n")
-        for c in clients:
-            f.write(f"{c[0]} {c[1]} {c[2]}\n")
-        for fac in facilities:
-            f.write(f"{fac[0]} {fac[1]} {fac[2]} {fac[3]}\n")
+        np.savetxt(f, client_rows, fmt="%s %.2f %.2f")
+        np.savetxt(f, fac_rows, fmt="%s %.2f %.2f %d")
         f.write(str(coverage) + "\n")
 
 
@@ -39,19 +36,19 @@ def generate_test_case(filename, n_clients, n_facilities, coverage):
 for i in range(1, 51):
     if i <= 20:
         # Fast: small
-        n_clients = random.randint(5,10)
-        n_facilities = random.randint(5,10)
-        coverage = random.uniform(15, 30)
+        n_clients = rng.integers(5, 11)
+        n_facilities = rng.integers(5, 11)
+        coverage = rng.uniform(15, 30)
     elif i <= 40:
         # Medium: ~1 min
-        n_clients = random.randint(10,15)
-        n_facilities = random.randint(12,18)
-        coverage = random.uniform(5, 15)
+        n_clients = rng.integers(10, 16)
+        n_facilities = rng.integers(12, 19)
+        coverage = rng.uniform(5, 15)
     else:
         # Slow: minutes
-        n_clients = random.randint(15,20)
-        n_facilities = random.randint(20,25)
-        coverage = random.uniform(5, 10)
+        n_clients = rng.integers(15, 21)
+        n_facilities = rng.integers(20, 26)
+        coverage = rng.uniform(5, 10)
 
     filename = f"realistic_test_cases/test_case_{i}.txt"
     generate_test_case(filename, n_clients, n_facilities, coverage)
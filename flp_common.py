@@ -0,0 +1,61 @@
+"""
+Helpers shared by the solvers in exact_solution/, blake_approx_solution/,
+dustin_approx_sol/ and reduced_solution/. Each of those adds the repository
+root to sys.path and imports from here.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernels then run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda fn: fn
+
+
+def coverage_threshold2(coverage_dist):
+    """
+    Largest float t with sqrt(t) <= coverage_dist, so `d2 <= t` makes the
+    same decision as `sqrt(d2) <= coverage_dist` for every d2, including
+    pairs right on the boundary where coverage_dist**2 alone could round
+    either way.
+    """
+    t = coverage_dist * coverage_dist
+    if coverage_dist < 0 or not math.isfinite(t):
+        return -math.inf if coverage_dist < 0 else t
+    while math.sqrt(t) > coverage_dist:
+        t = math.nextafter(t, -math.inf)
+    while math.sqrt(math.nextafter(t, math.inf)) <= coverage_dist:
+        t = math.nextafter(t, math.inf)
+    return t
+
+
+def run_restart_streams(task, stream_args, seed, initializer, initargs):
+    """
+    Run one independent restart stream per entry of stream_args and return
+    the results in stream order. Stream i calls task(*stream_args[i], s_i),
+    where s_i is its own SeedSequence spawned from `seed`.
+
+    A single stream runs in this process; several run in one worker process
+    each. initializer(*initargs) first sets up every process that runs a
+    stream (this one included, for a single stream).
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(stream_args))
+    if len(stream_args) == 1:
+        initializer(*initargs)
+        return [task(*stream_args[0], seeds[0])]
+
+    with ProcessPoolExecutor(
+        max_workers=len(stream_args),
+        initializer=initializer,
+        initargs=initargs,
+    ) as pool:
+        futures = [
+            pool.submit(task, *args, s) for args, s in zip(stream_args, seeds)
+        ]
+        return [fut.result() for fut in futures]
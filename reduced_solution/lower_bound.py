@@ -1,6 +1,13 @@
+import os
 import sys
 import math
 
+import numpy as np
+
+# Shared helpers (flp_common) live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flp_common import coverage_threshold2
+
 
 def next_data_line(stream):
     """Read next non-empty, non-comment line or raise on EOF."""
@@ -23,6 +30,7 @@ def read_instance(stream):
 
     Returns:
         f, c, fac_xy, cust_xy, coverage
+    where fac_xy and cust_xy are (f, 2) and (c, 2) float arrays.
     """
 
     header = next_data_line(stream)
@@ -43,8 +51,9 @@ def read_instance(stream):
                 f"Client line must have at least 3 tokens (name x y), got: {line!r}"
             )
         # name = tokens[0]
-        x_str, y_str = tokens[1], tokens[2]
-        cust_xy.append((float(x_str), float(y_str)))
+        cust_xy.append(tokens[1:3])
+    # Convert the whole block in one C-level pass instead of float() per token
+    cust_xy = np.array(cust_xy, dtype=float).reshape(c, 2)
 
     # Facilities
     fac_xy = []
@@ -57,9 +66,9 @@ def read_instance(stream):
                 "(name x y open_flag), got: {line!r}"
             )
         # name = tokens[0]
-        x_str, y_str = tokens[1], tokens[2]
         # open_flag = tokens[3]  # ignored here
-        fac_xy.append((float(x_str), float(y_str)))
+        fac_xy.append(tokens[1:3])
+    fac_xy = np.array(fac_xy, dtype=float).reshape(f, 2)
 
     # Coverage distance
     coverage_line = next_data_line(stream)
@@ -87,21 +96,19 @@ def compute_lower_bound(f, c, fac_xy, cust_xy, coverage):
         LB (integer number of facilities), or inf if infeasible
     """
 
+    # All facility-client squared distances in one broadcast, compared
+    # against the squared coverage threshold (no square roots needed)
+    F = np.asarray(fac_xy, dtype=float).reshape(f, 2)
+    C = np.asarray(cust_xy, dtype=float).reshape(c, 2)
+    diff = F[:, None, :] - C[None, :, :]
+    in_range = (diff * diff).sum(-1) <= coverage_threshold2(coverage)
+
     # Build list of feasible coverage options:
     # covers[i] = list of client indices covered by facility i
-    covers = [[] for _ in range(f)]
-    for i in range(f):
-        fx, fy = fac_xy[i]
-        for j in range(c):
-            cx, cy = cust_xy[j]
-            if math.dist((fx, fy), (cx, cy)) <= coverage:
-                covers[i].append(j)
+    covers = [np.flatnonzero(row).tolist() for row in in_range]
 
     # For each client, track the facilities that can cover them
-    can_cover = [[] for _ in range(c)]
-    for i in range(f):
-        for j in covers[i]:
-            can_cover[j].append(i)
+    can_cover = [np.flatnonzero(col).tolist() for col in in_range.T]
 
     # If any client has no coverage option → infeasible
     for j in range(c):
@@ -130,23 +137,22 @@ def compute_lower_bound(f, c, fac_xy, cust_xy, coverage):
     # Step 3: Greedy set-cover lower bound for remaining clients
     lb = len(required_facilities)
 
-    while remaining_clients:
+    remaining = np.zeros(c, dtype=bool)
+    remaining[list(remaining_clients)] = True
+    cover_counts = in_range.astype(np.intp)
+
+    while remaining.any():
         # pick facility covering the most of the remaining uncovered clients
-        best_fac = None
-        best_cover = 0
-        for i in range(f):
-            count = sum(1 for j in covers[i] if j in remaining_clients)
-            if count > best_cover:
-                best_cover = count
-                best_fac = i
-
-        if best_fac is None:
+        # (one matrix-vector product; argmax keeps the first on ties)
+        gains = cover_counts @ remaining
+        best_fac = int(gains.argmax())
+
+        if gains[best_fac] == 0:
             return float('inf')
 
         # open this facility
         lb += 1
-        for j in covers[best_fac]:
-            remaining_clients.discard(j)
+        remaining &= ~in_range[best_fac]
 
     return lb
 
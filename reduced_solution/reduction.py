@@ -41,10 +41,11 @@ variables are numbered 1..n.
 """
 
 import sys
-import math
 import argparse
 from typing import List, Tuple, TextIO
 
+import numpy as np
+
 
 # ---------------------------------------------------------------------
 # CNF representation
@@ -175,19 +176,16 @@ def build_service_costs(
     If dist > coverage, the assignment is forbidden and we encode that by
     storing a negative sentinel value service_cost[j][i] = -1.0.
     """
-    service_cost = [[0.0 for _ in range(f)] for _ in range(c)]
-    for j in range(c):
-        cx, cy = cust_coords[j]
-        dj = cust_demands[j]
-        for i in range(f):
-            fx, fy = fac_coords[i]
-            dist = math.dist((cx, cy), (fx, fy))
-            if dist > coverage:
-                # Forbidden edge: handled specially in the reduction.
-                service_cost[j][i] = -1.0
-            else:
-                service_cost[j][i] = dj * dist
-    return service_cost
+    # dist[j, i] for every customer/facility pair in one broadcast
+    cust = np.asarray(cust_coords, dtype=float).reshape(c, 2)
+    fac = np.asarray(fac_coords, dtype=float).reshape(f, 2)
+    diff = cust[:, None, :] - fac[None, :, :]
+    dist = np.sqrt((diff * diff).sum(-1))
+
+    service_cost = np.asarray(cust_demands, dtype=float)[:, None] * dist
+    # Forbidden edge: handled specially in the reduction.
+    service_cost[dist > coverage] = -1.0
+    return service_cost.tolist()
 
 
 # ---------------------------------------------------------------------
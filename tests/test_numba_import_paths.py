@@ -0,0 +1,41 @@
+"""
+The solver modules are imported both as top-level modules (scripts run from
+their own directory) and as package modules (exact_solution.facility_location_exact
+from compare.py and friends). Compiled kernels must load under either name
+from the same numba cache directory.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    ("exact_solution", "facility_location_exact"),
+    ("dustin_approx_sol", "facility_location_approx"),
+    ("blake_approx_solution", "facility_location_approx_blake"),
+]
+
+
+def _warm_up(module, cwd, cache_dir):
+    env = dict(os.environ, NUMBA_CACHE_DIR=str(cache_dir))
+    proc = subprocess.run(
+        [sys.executable, "-c", f"import {module}; {module}._warm_up_kernels()"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+
+
+@pytest.mark.parametrize("package, module", MODULES)
+def test_kernels_load_under_both_module_names(package, module, tmp_path):
+    # Top-level name first (populates the cache), then the package name,
+    # then top-level again
+    _warm_up(module, os.path.join(ROOT, package), tmp_path)
+    _warm_up(f"{package}.{module}", ROOT, tmp_path)
+    _warm_up(module, os.path.join(ROOT, package), tmp_path)